@@ -0,0 +1,276 @@
+"""
+Response cache for prompt corrections.
+"""
+
+import time
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+# An embedder maps a list of texts to a 2-D array of embedding vectors
+Embedder = Callable[[List[str]], "np.ndarray"]
+
+
+def normalize_prompt(raw_prompt: str) -> str:
+    """
+    Normalize a prompt for cache lookups.
+
+    Args:
+        raw_prompt: The raw prompt from speech-to-text
+
+    Returns:
+        Lowercased prompt with collapsed whitespace
+    """
+    return " ".join(raw_prompt.lower().split())
+
+
+def load_default_embedder() -> Optional[Embedder]:
+    """
+    Load a small local sentence-embedding model if one is installed.
+
+    Tries fastembed first, then sentence-transformers.
+
+    Returns:
+        An embedder callable, or None if no embedding library is available.
+    """
+    try:
+        from fastembed import TextEmbedding
+
+        model = TextEmbedding("sentence-transformers/all-MiniLM-L6-v2")
+        return lambda texts: np.array(list(model.embed(texts)))
+    except ImportError:
+        pass
+
+    try:
+        from sentence_transformers import SentenceTransformer
+
+        model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+        return lambda texts: model.encode(texts)
+    except ImportError:
+        pass
+
+    print("Warning: No embedding library installed, semantic cache disabled")
+    return None
+
+
+class PromptCache:
+    """
+    Two-tier cache of raw prompt to corrected prompt.
+
+    The first tier is an exact-match LRU keyed by the normalized prompt.
+    The optional second tier embeds cached prompts and returns the
+    correction of the most similar cached prompt when its cosine
+    similarity reaches the threshold. Entries optionally expire after a
+    fixed time-to-live.
+    """
+
+    def __init__(self, maxsize: int = 4096, similarity_threshold: float = 0.92,
+                 embedder: Optional[Embedder] = None, ttl: Optional[float] = None):
+        """
+        Initialize the PromptCache.
+
+        Args:
+            maxsize: Maximum number of cached prompts
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+            embedder: Optional embedder enabling the semantic tier
+            ttl: Seconds an entry stays valid after it is stored (None keeps it until evicted)
+        """
+        self.maxsize = maxsize
+        self.similarity_threshold = similarity_threshold
+        self.embedder = embedder
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._expires: Dict[str, float] = {}
+
+        # Semantic tier: one matrix row per cached key, freed rows are zeroed
+        self._matrix: Optional[np.ndarray] = None
+        self._slots = {}
+        self._slot_keys: List[Optional[str]] = [None] * maxsize
+        self._free_slots = list(range(maxsize - 1, -1, -1))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, raw_prompt: str) -> Optional[str]:
+        """
+        Look up the corrected prompt for a raw prompt.
+
+        Args:
+            raw_prompt: The raw prompt from speech-to-text
+
+        Returns:
+            The cached corrected prompt, or None on a miss
+        """
+        key = normalize_prompt(raw_prompt)
+        with self._lock:
+            if key in self._entries and not self._expire(key):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+            if self.embedder is None or not self._slots:
+                self.misses += 1
+                return None
+
+        # Embed outside the lock, then score against every cached prompt
+        query = self._embed([key])[0]
+        with self._lock:
+            scores = self._matrix @ query
+            slot = int(np.argmax(scores))
+            match = self._slot_keys[slot]
+            if match is None or scores[slot] < self.similarity_threshold or self._expire(match):
+                self.misses += 1
+                return None
+            self.hits += 1
+            return self._entries.get(match)
+
+    def put(self, raw_prompt: str, corrected_prompt: str) -> None:
+        """
+        Store a corrected prompt.
+
+        Args:
+            raw_prompt: The raw prompt from speech-to-text
+            corrected_prompt: The corrected version
+        """
+        key = normalize_prompt(raw_prompt)
+        vector = self._embed([key])[0] if self.embedder is not None else None
+
+        with self._lock:
+            self._insert(key, corrected_prompt, vector)
+
+    def clear(self) -> None:
+        """Remove all cached prompts."""
+        with self._lock:
+            self._entries.clear()
+            self._expires.clear()
+            for key in list(self._slots):
+                self._free_vector(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache size and hit rate.
+
+        Returns:
+            Dictionary with size, hits, misses and hit_rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+    def save(self, path: str) -> None:
+        """
+        Persist cached prompts to disk.
+
+        Expiry times are stored as wall-clock timestamps so they still hold
+        after a restart.
+
+        Args:
+            path: File to write
+        """
+        with self._lock:
+            # Monotonic time does not survive a restart; convert to wall-clock
+            offset = time.time() - time.monotonic()
+            entries = [
+                (key, value, self._expires[key] + offset if key in self._expires else None)
+                for key, value in self._entries.items()
+            ]
+        with open(path, "wb") as f:
+            pickle.dump(entries, f)
+
+    def load(self, path: str) -> None:
+        """
+        Load cached prompts from disk, skipping ones that have expired.
+
+        Args:
+            path: File written by save()
+        """
+        with open(path, "rb") as f:
+            saved = pickle.load(f)
+
+        now = time.time()
+        entries = []
+        for entry in saved:
+            # Files from before expiry times were persisted hold (key, value) pairs
+            key, value, expires_at = entry if len(entry) == 3 else (*entry, None)
+            if expires_at is None or expires_at > now:
+                entries.append((key, value, expires_at))
+        entries = entries[-self.maxsize:]
+
+        vectors = self._embed([key for key, _, _ in entries]) if self.embedder and entries else None
+
+        with self._lock:
+            offset = time.monotonic() - now
+            for i, (key, value, expires_at) in enumerate(entries):
+                expires = expires_at + offset if expires_at is not None else None
+                self._insert(key, value, vectors[i] if vectors is not None else None, expires)
+
+    def _insert(self, key: str, value: str, vector: Optional[np.ndarray],
+                expires: Optional[float] = None) -> None:
+        """
+        Store an entry, evicting the least recently used ones. Caller holds the lock.
+
+        An explicit monotonic expiry time overrides the cache's time-to-live.
+        """
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if expires is not None:
+            self._expires[key] = expires
+        elif self.ttl is not None:
+            self._expires[key] = time.monotonic() + self.ttl
+        else:
+            self._expires.pop(key, None)
+
+        while len(self._entries) > self.maxsize:
+            evicted, _ = self._entries.popitem(last=False)
+            self._expires.pop(evicted, None)
+            self._free_vector(evicted)
+
+        if vector is not None and key not in self._slots:
+            self._store_vector(key, vector)
+
+    def _expire(self, key: str) -> bool:
+        """Drop a key whose time-to-live has passed. Caller holds the lock."""
+        expires = self._expires.get(key)
+        if expires is None or time.monotonic() < expires:
+            return False
+        del self._entries[key]
+        del self._expires[key]
+        self._free_vector(key)
+        return True
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """Embed texts as L2-normalized float32 vectors."""
+        vectors = np.asarray(self.embedder(texts), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def _store_vector(self, key: str, vector: np.ndarray) -> None:
+        """Place a key's vector in a free matrix row."""
+        if self._matrix is None:
+            self._matrix = np.zeros((self.maxsize, vector.shape[0]), dtype=np.float32)
+        if not self._free_slots:
+            return
+        slot = self._free_slots.pop()
+        self._matrix[slot] = vector
+        self._slots[key] = slot
+        self._slot_keys[slot] = key
+
+    def _free_vector(self, key: str) -> None:
+        """Release a key's matrix row, if it has one."""
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return
+        self._matrix[slot] = 0.0
+        self._slot_keys[slot] = None
+        self._free_slots.append(slot)
@@ -3,15 +3,98 @@ Claude LanguageModel wrapper for DSPy integration.
 """
 
 import os
-from typing import Optional, Dict, Any, List
+import time
+import random
+import asyncio
+import functools
+from typing import Optional, Dict, Any, AsyncIterator, List
 import anthropic
+import httpx
 from dspy.clients import LM
 
+# Fast, inexpensive model suited to short prompt-correction requests
+DEFAULT_MODEL = "claude-3-5-haiku-latest"
+
+# Transient errors worth retrying (APITimeoutError is an APIConnectionError)
+_RETRYABLE_ERRORS = (anthropic.RateLimitError, anthropic.APIConnectionError, anthropic.InternalServerError)
+
+# Other HTTP statuses worth retrying: request timeout, conflict and 529
+# overloaded, which the SDK does not raise as an InternalServerError
+_RETRYABLE_STATUS_CODES = (408, 409, 529)
+
+# Upper bound in seconds for a single backoff sleep
+_MAX_BACKOFF = 30.0
+
+
+def get_configured_model() -> str:
+    """
+    Get the Claude model configured in the environment.
+
+    DSPY_CLAUDE_MODEL takes precedence over the older CLAUDE_MODEL variable.
+
+    Returns:
+        Claude model name.
+    """
+    return os.getenv("DSPY_CLAUDE_MODEL") or os.getenv("CLAUDE_MODEL") or DEFAULT_MODEL
+
+
+@functools.lru_cache(maxsize=8)
+def _get_client(api_key: str) -> anthropic.Anthropic:
+    """
+    Get a shared Anthropic client for the given API key.
+
+    The client is cached so every ClaudeLM instance reuses the same
+    keep-alive connection pool instead of opening new TCP/TLS connections.
+
+    Args:
+        api_key: Anthropic API key.
+
+    Returns:
+        Cached Anthropic client.
+    """
+    timeout = httpx.Timeout(60.0, connect=5.0)
+    http_client = httpx.Client(
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+        timeout=timeout
+    )
+    # Retries are handled by ClaudeLM so backoff is not applied twice
+    return anthropic.Anthropic(api_key=api_key, http_client=http_client, timeout=timeout, max_retries=0)
+
+
+@functools.lru_cache(maxsize=8)
+def _get_async_client(api_key: str) -> anthropic.AsyncAnthropic:
+    """
+    Get a shared AsyncAnthropic client for the given API key.
+
+    Args:
+        api_key: Anthropic API key.
+
+    Returns:
+        Cached AsyncAnthropic client.
+    """
+    timeout = httpx.Timeout(60.0, connect=5.0)
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+        timeout=timeout
+    )
+    return anthropic.AsyncAnthropic(api_key=api_key, http_client=http_client, timeout=timeout, max_retries=0)
+
+
+def reset_clients() -> None:
+    """
+    Drop the shared Anthropic clients so the next ClaudeLM opens new ones.
+
+    Call this after using a model in a process that is about to fork, so
+    child processes never share its connection pools.
+    """
+    _get_client.cache_clear()
+    _get_async_client.cache_clear()
+
 
 class ClaudeLM(LM):
     """Custom LanguageModel wrapper for Anthropic's Claude API."""
 
-    def __init__(self, api_key: Optional[str] = None, model: str = "claude-3-haiku-20240307"):
+    def __init__(self, api_key: Optional[str] = None, model: str = DEFAULT_MODEL):
         """
         Initialize Claude LanguageModel.
 
@@ -24,16 +107,165 @@ class ClaudeLM(LM):
             raise ValueError("ANTHROPIC_API_KEY must be provided or set in environment")
 
         self.model = model
-        self.client = anthropic.Anthropic(api_key=self.api_key)
+        self.client = _get_client(self.api_key)
+        self.async_client = _get_async_client(self.api_key)
 
         # Default parameters
         self.temperature = float(os.getenv("DSPY_TEMPERATURE", "0.7"))
         self.max_tokens = int(os.getenv("DSPY_MAX_TOKENS", "4096"))
+        self.max_retries = int(os.getenv("DSPY_MAX_RETRIES", "5"))
 
         # Add required attributes for DSPy compatibility
         self.kwargs = {}
         self.provider = "anthropic"
 
+    def _build_request(self, prompt: Optional[str], messages: Optional[List[Dict[str, str]]],
+                       **kwargs) -> Dict[str, Any]:
+        """
+        Build the parameters for a messages.create call.
+
+        Args:
+            prompt: The prompt to send to Claude (for backward compatibility).
+            messages: List of message dictionaries (for DSPy compatibility).
+            **kwargs: Additional parameters (temperature, max_tokens, etc.)
+
+        Returns:
+            Keyword arguments for the Anthropic messages API.
+        """
+        # Use kwargs or fall back to instance defaults
+        temperature = kwargs.get("temperature", self.temperature)
+        max_tokens = kwargs.get("max_tokens", self.max_tokens)
+
+        # Handle DSPy's calling pattern
+        if messages is not None:
+            # Extract system message if present
+            system_message = None
+            user_messages = []
+
+            for message in messages:
+                if message.get("role") == "system":
+                    system_message = message.get("content")
+                else:
+                    user_messages.append(message)
+
+            # Prepare API call parameters
+            api_params = {
+                "model": self.model,
+                "max_tokens": max_tokens,
+                "temperature": temperature,
+                "messages": self._mark_demo_prefix(user_messages)
+            }
+
+            # Add system message as top-level parameter if present, marked for
+            # prompt caching so repeated instructions skip server-side prefill
+            if system_message:
+                api_params["system"] = [{
+                    "type": "text",
+                    "text": system_message,
+                    "cache_control": {"type": "ephemeral"}
+                }]
+
+            return api_params
+
+        elif prompt is not None:
+            # Backward compatibility with direct prompt
+            return {
+                "model": self.model,
+                "max_tokens": max_tokens,
+                "temperature": temperature,
+                "messages": [
+                    {"role": "user", "content": prompt}
+                ]
+            }
+        else:
+            raise ValueError("Either 'prompt' or 'messages' must be provided")
+
+    @staticmethod
+    def _mark_demo_prefix(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Mark the few-shot demonstrations as a cacheable prefix.
+
+        DSPy sends compiled demos as user/assistant turns ahead of the final
+        user turn. Those turns are identical across requests, so a cache
+        breakpoint on the last of them lets Claude reuse their prefill and
+        only the raw prompt is processed fresh.
+
+        Args:
+            messages: Conversation turns without the system message
+
+        Returns:
+            The turns with the last demo turn converted to a cached text block
+        """
+        if len(messages) < 2 or not isinstance(messages[-2].get("content"), str):
+            return messages
+
+        marked = dict(messages[-2])
+        marked["content"] = [{
+            "type": "text",
+            "text": marked["content"],
+            "cache_control": {"type": "ephemeral"}
+        }]
+        return messages[:-2] + [marked, messages[-1]]
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        """Check whether a failed request is worth retrying."""
+        if isinstance(error, _RETRYABLE_ERRORS):
+            return True
+        return isinstance(error, anthropic.APIStatusError) and error.status_code in _RETRYABLE_STATUS_CODES
+
+    @staticmethod
+    def _retry_delay(error: Exception, attempt: int) -> float:
+        """
+        Get the delay before retrying a failed request.
+
+        Honors the Retry-After header when the API sends one, otherwise
+        uses jittered exponential backoff.
+
+        Args:
+            error: The retryable error that was raised.
+            attempt: Zero-based number of the failed attempt.
+
+        Returns:
+            Seconds to wait before the next attempt.
+        """
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        try:
+            return min(_MAX_BACKOFF, float(retry_after))
+        except (TypeError, ValueError):
+            return min(_MAX_BACKOFF, 2 ** attempt + random.random())
+
+    def _create_with_retry(self, api_params: Dict[str, Any]):
+        """Call messages.create, retrying transient errors with backoff."""
+        for attempt in range(self.max_retries):
+            try:
+                return self.client.messages.create(**api_params)
+            except anthropic.APIError as e:
+                if not self._is_retryable(e):
+                    raise
+                time.sleep(self._retry_delay(e, attempt))
+        return self.client.messages.create(**api_params)
+
+    async def _acreate_with_retry(self, api_params: Dict[str, Any]):
+        """Async counterpart of _create_with_retry."""
+        for attempt in range(self.max_retries):
+            try:
+                return await self.async_client.messages.create(**api_params)
+            except anthropic.APIError as e:
+                if not self._is_retryable(e):
+                    raise
+                await asyncio.sleep(self._retry_delay(e, attempt))
+        return await self.async_client.messages.create(**api_params)
+
+    @staticmethod
+    def _extract_text(response) -> str:
+        """Extract the text of the first content block from a Claude response."""
+        if response.content and len(response.content) > 0:
+            return response.content[0].text
+        else:
+            return ""
+
     def __call__(self, prompt: str = None, messages: List[Dict[str, str]] = None, **kwargs) -> str:
         """
         Call Claude API with the given prompt or messages.
@@ -47,55 +279,125 @@ class ClaudeLM(LM):
             Claude's response as a string.
         """
         try:
-            # Use kwargs or fall back to instance defaults
-            temperature = kwargs.get("temperature", self.temperature)
-            max_tokens = kwargs.get("max_tokens", self.max_tokens)
-
-            # Handle DSPy's calling pattern
-            if messages is not None:
-                # Extract system message if present
-                system_message = None
-                user_messages = []
-
-                for message in messages:
-                    if message.get("role") == "system":
-                        system_message = message.get("content")
-                    else:
-                        user_messages.append(message)
-
-                # Prepare API call parameters
-                api_params = {
-                    "model": self.model,
-                    "max_tokens": max_tokens,
-                    "temperature": temperature,
-                    "messages": user_messages
-                }
-
-                # Add system message as top-level parameter if present
-                if system_message:
-                    api_params["system"] = system_message
-
-                response = self.client.messages.create(**api_params)
-
-            elif prompt is not None:
-                # Backward compatibility with direct prompt
-                response = self.client.messages.create(
-                    model=self.model,
-                    max_tokens=max_tokens,
-                    temperature=temperature,
-                    messages=[
-                        {"role": "user", "content": prompt}
-                    ]
-                )
-            else:
-                raise ValueError("Either 'prompt' or 'messages' must be provided")
-
-            # Extract text from response
-            if response.content and len(response.content) > 0:
-                return response.content[0].text
-            else:
-                return ""
+            api_params = self._build_request(prompt, messages, **kwargs)
+            response = self._create_with_retry(api_params)
+            return self._extract_text(response)
+
+        except Exception as e:
+            raise RuntimeError(f"Error calling Claude API: {str(e)}")
+
+    async def acall(self, prompt: str = None, messages: List[Dict[str, str]] = None, **kwargs) -> List[str]:
+        """
+        Asynchronously call Claude API with the given prompt or messages.
+
+        Uses the shared AsyncAnthropic client so many calls can be in flight
+        at once without blocking the event loop. This is the method DSPy's
+        async adapters call, so it returns a list of completions like dspy.LM.
+
+        Args:
+            prompt: The prompt to send to Claude.
+            messages: List of message dictionaries (for DSPy compatibility).
+            **kwargs: Additional parameters (temperature, max_tokens, etc.)
+
+        Returns:
+            A single-item list with Claude's response.
+        """
+        try:
+            api_params = self._build_request(prompt, messages, **kwargs)
+            response = await self._acreate_with_retry(api_params)
+            return [self._extract_text(response)]
+
+        except Exception as e:
+            raise RuntimeError(f"Error calling Claude API: {str(e)}")
+
+    def stream_first_line(self, prompt: str = None, messages: List[Dict[str, str]] = None, **kwargs) -> str:
+        """
+        Stream a response and stop reading at the end of its first line.
+
+        Meant for single-line answers such as a corrected prompt: anything
+        the model adds after the answer is never waited for. Falls back to a
+        regular call if streaming fails.
+
+        Args:
+            prompt: The prompt to send to Claude.
+            messages: List of message dictionaries.
+            **kwargs: Additional parameters (temperature, max_tokens, etc.)
+
+        Returns:
+            The first non-empty line of Claude's response.
+        """
+        api_params = self._build_request(prompt, messages, **kwargs)
+        # Let the server stop early too once the model starts a new paragraph
+        api_params["stop_sequences"] = ["\n\n"]
+
+        try:
+            chunks = []
+            with self.client.messages.stream(**api_params) as stream:
+                for text in stream.text_stream:
+                    chunks.append(text)
+                    if "\n" in "".join(chunks).lstrip():
+                        break
+            return "".join(chunks).lstrip().partition("\n")[0]
+
+        except Exception as e:
+            print(f"Warning: Claude streaming failed, using a regular call: {e}")
+            return self(prompt=prompt, messages=messages, **kwargs)
+
+    async def astream_first_line(self, prompt: str = None, messages: List[Dict[str, str]] = None,
+                                 **kwargs) -> str:
+        """
+        Async counterpart of stream_first_line.
+
+        Args:
+            prompt: The prompt to send to Claude.
+            messages: List of message dictionaries.
+            **kwargs: Additional parameters (temperature, max_tokens, etc.)
+
+        Returns:
+            The first non-empty line of Claude's response.
+        """
+        api_params = self._build_request(prompt, messages, **kwargs)
+        api_params["stop_sequences"] = ["\n\n"]
 
+        try:
+            chunks = []
+            async with self.async_client.messages.stream(**api_params) as stream:
+                async for text in stream.text_stream:
+                    chunks.append(text)
+                    if "\n" in "".join(chunks).lstrip():
+                        break
+            return "".join(chunks).lstrip().partition("\n")[0]
+
+        except Exception as e:
+            print(f"Warning: Claude streaming failed, using a regular call: {e}")
+            completions = await self.acall(prompt=prompt, messages=messages, **kwargs)
+            return completions[0]
+
+    async def astream(self, prompt: str = None, messages: List[Dict[str, str]] = None,
+                      stop_sequences: Optional[List[str]] = None, **kwargs) -> AsyncIterator[str]:
+        """
+        Stream Claude's response text as it is generated.
+
+        Closing the generator early closes the underlying HTTP stream, so
+        Claude stops generating (and billing) output nobody will read.
+
+        Args:
+            prompt: The prompt to send to Claude.
+            messages: List of message dictionaries.
+            stop_sequences: Optional sequences that end generation.
+            **kwargs: Additional parameters (temperature, max_tokens, etc.)
+
+        Yields:
+            Text deltas of Claude's response.
+        """
+        api_params = self._build_request(prompt, messages, **kwargs)
+        if stop_sequences:
+            api_params["stop_sequences"] = stop_sequences
+
+        try:
+            async with self.async_client.messages.stream(**api_params) as stream:
+                async for text in stream.text_stream:
+                    yield text
         except Exception as e:
             raise RuntimeError(f"Error calling Claude API: {str(e)}")
 
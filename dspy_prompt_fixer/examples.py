@@ -2,66 +2,151 @@
 Training examples for DSPy prompt correction optimization.
 """
 
-from typing import List, Dict, Any, Union
+import sys
+import functools
+from typing import List, Dict, Any, Optional, Tuple, Union
 import dspy
 
+from .cache import normalize_prompt
+
+
+def _make_example(raw_prompt: str, corrected_prompt: str) -> dspy.Example:
+    """
+    Build a training example ready for compilation.
+
+    Strings are interned so repeated prompts share one object, and
+    raw_prompt is marked as the input field.
+
+    Args:
+        raw_prompt: The raw prompt from speech-to-text
+        corrected_prompt: The corrected version
+
+    Returns:
+        DSPy Example object
+    """
+    return dspy.Example(
+        raw_prompt=sys.intern(raw_prompt),
+        corrected_prompt=sys.intern(corrected_prompt)
+    ).with_inputs("raw_prompt")
+
+
 # Core training examples for programming prompt correction
 PROGRAMMING_EXAMPLES = [
-    dspy.Example(raw_prompt="frogs in ruby", corrected_prompt="procs in ruby"),
-    dspy.Example(raw_prompt="rails and rels", corrected_prompt="rails and routes"),
-    dspy.Example(raw_prompt="how to use cads in ruby", corrected_prompt="how to use procs in ruby"),
-    dspy.Example(raw_prompt="ruby on rails gems", corrected_prompt="ruby on rails gems"),
-    dspy.Example(raw_prompt="javascript promises and async", corrected_prompt="javascript promises and async"),
-    dspy.Example(raw_prompt="react hooks and state", corrected_prompt="react hooks and state"),
-    dspy.Example(raw_prompt="python decorators and functions", corrected_prompt="python decorators and functions"),
-    dspy.Example(raw_prompt="docker containers and images", corrected_prompt="docker containers and images"),
-    dspy.Example(raw_prompt="git branches and merging", corrected_prompt="git branches and merging"),
-    dspy.Example(raw_prompt="sql queries and joins", corrected_prompt="sql queries and joins"),
-    dspy.Example(raw_prompt="api rest endpoints", corrected_prompt="api rest endpoints"),
-    dspy.Example(raw_prompt="microservices architecture", corrected_prompt="microservices architecture"),
-    dspy.Example(raw_prompt="machine learning algorithms", corrected_prompt="machine learning algorithms"),
-    dspy.Example(raw_prompt="data structures and algorithms", corrected_prompt="data structures and algorithms"),
-    dspy.Example(raw_prompt="web development frameworks", corrected_prompt="web development frameworks"),
+    _make_example("frogs in ruby", "procs in ruby"),
+    _make_example("rails and rels", "rails and routes"),
+    _make_example("how to use cads in ruby", "how to use procs in ruby"),
+    _make_example("ruby on rails gems", "ruby on rails gems"),
+    _make_example("javascript promises and async", "javascript promises and async"),
+    _make_example("react hooks and state", "react hooks and state"),
+    _make_example("python decorators and functions", "python decorators and functions"),
+    _make_example("docker containers and images", "docker containers and images"),
+    _make_example("git branches and merging", "git branches and merging"),
+    _make_example("sql queries and joins", "sql queries and joins"),
+    _make_example("api rest endpoints", "api rest endpoints"),
+    _make_example("microservices architecture", "microservices architecture"),
+    _make_example("machine learning algorithms", "machine learning algorithms"),
+    _make_example("data structures and algorithms", "data structures and algorithms"),
+    _make_example("web development frameworks", "web development frameworks"),
 ]
 
 # Additional examples for common speech-to-text errors
 SPEECH_ERROR_EXAMPLES = [
-    dspy.Example(raw_prompt="how to create a new rails app", corrected_prompt="how to create a new rails app"),
-    dspy.Example(raw_prompt="what is dependency injection", corrected_prompt="what is dependency injection"),
-    dspy.Example(raw_prompt="explain object oriented programming",
-                 corrected_prompt="explain object oriented programming"),
-    dspy.Example(raw_prompt="how to debug javascript code", corrected_prompt="how to debug javascript code"),
-    dspy.Example(raw_prompt="what are design patterns", corrected_prompt="what are design patterns"),
-    dspy.Example(raw_prompt="how to optimize database queries", corrected_prompt="how to optimize database queries"),
-    dspy.Example(raw_prompt="explain restful api design", corrected_prompt="explain restful api design"),
-    dspy.Example(raw_prompt="what is continuous integration", corrected_prompt="what is continuous integration"),
-    dspy.Example(raw_prompt="how to write unit tests", corrected_prompt="how to write unit tests"),
-    dspy.Example(raw_prompt="explain version control systems", corrected_prompt="explain version control systems"),
+    _make_example("how to create a new rails app", "how to create a new rails app"),
+    _make_example("what is dependency injection", "what is dependency injection"),
+    _make_example("explain object oriented programming", "explain object oriented programming"),
+    _make_example("how to debug javascript code", "how to debug javascript code"),
+    _make_example("what are design patterns", "what are design patterns"),
+    _make_example("how to optimize database queries", "how to optimize database queries"),
+    _make_example("explain restful api design", "explain restful api design"),
+    _make_example("what is continuous integration", "what is continuous integration"),
+    _make_example("how to write unit tests", "how to write unit tests"),
+    _make_example("explain version control systems", "explain version control systems"),
 ]
 
 # Examples for technical terminology corrections
 TECHNICAL_CORRECTIONS = [
-    dspy.Example(raw_prompt="lambda functions in python", corrected_prompt="lambda functions in python"),
-    dspy.Example(raw_prompt="closures and scope in javascript", corrected_prompt="closures and scope in javascript"),
-    dspy.Example(raw_prompt="inheritance and polymorphism", corrected_prompt="inheritance and polymorphism"),
-    dspy.Example(raw_prompt="recursion and iteration", corrected_prompt="recursion and iteration"),
-    dspy.Example(raw_prompt="asynchronous programming patterns", corrected_prompt="asynchronous programming patterns"),
-    dspy.Example(raw_prompt="memory management in programming", corrected_prompt="memory management in programming"),
-    dspy.Example(raw_prompt="algorithm complexity analysis", corrected_prompt="algorithm complexity analysis"),
-    dspy.Example(raw_prompt="software testing methodologies", corrected_prompt="software testing methodologies"),
-    dspy.Example(raw_prompt="database normalization", corrected_prompt="database normalization"),
-    dspy.Example(raw_prompt="network protocols and http", corrected_prompt="network protocols and http"),
+    _make_example("lambda functions in python", "lambda functions in python"),
+    _make_example("closures and scope in javascript", "closures and scope in javascript"),
+    _make_example("inheritance and polymorphism", "inheritance and polymorphism"),
+    _make_example("recursion and iteration", "recursion and iteration"),
+    _make_example("asynchronous programming patterns", "asynchronous programming patterns"),
+    _make_example("memory management in programming", "memory management in programming"),
+    _make_example("algorithm complexity analysis", "algorithm complexity analysis"),
+    _make_example("software testing methodologies", "software testing methodologies"),
+    _make_example("database normalization", "database normalization"),
+    _make_example("network protocols and http", "network protocols and http"),
 ]
 
+# Category name to the list of examples it holds
+_CATEGORIES: Dict[str, List[dspy.Example]] = {
+    "programming": PROGRAMMING_EXAMPLES,
+    "speech": SPEECH_ERROR_EXAMPLES,
+    "technical": TECHNICAL_CORRECTIONS,
+}
+
 
-def get_all_examples() -> List[dspy.Example]:
+@functools.lru_cache(maxsize=1)
+def get_all_examples() -> Tuple[dspy.Example, ...]:
     """
     Get all training examples combined.
 
+    The result is cached until add_example() changes a category.
+
+    Returns:
+        Tuple of all training examples for DSPy optimization.
+    """
+    return tuple(PROGRAMMING_EXAMPLES + SPEECH_ERROR_EXAMPLES + TECHNICAL_CORRECTIONS)
+
+
+# Normalized raw prompt to correction, with the example tuple it was built from
+_known_corrections: Tuple[Optional[Tuple[dspy.Example, ...]], Dict[str, str]] = (None, {})
+
+
+def lookup_known_correction(raw_prompt: str) -> Optional[str]:
+    """
+    Look up the correction for a prompt that matches a known example.
+
+    The lookup table is rebuilt whenever get_all_examples() returns a new
+    snapshot, so examples added at runtime are picked up automatically.
+
+    Args:
+        raw_prompt: The raw prompt from speech-to-text
+
+    Returns:
+        The known corrected prompt, or None if the prompt is not an example
+    """
+    global _known_corrections
+
+    examples = get_all_examples()
+    source, known = _known_corrections
+    if source is not examples:
+        known = {normalize_prompt(ex.raw_prompt): ex.corrected_prompt for ex in examples}
+        _known_corrections = (examples, known)
+
+    return known.get(normalize_prompt(raw_prompt))
+
+
+def get_training_examples() -> List[dspy.Example]:
+    """
+    Get the examples worth compiling against.
+
+    Identity pairs (raw prompt already correct) and duplicate raw prompts are
+    dropped, since they add evaluation cost to every optimization candidate
+    without teaching a correction.
+
     Returns:
-        List of all training examples for DSPy optimization.
+        Deduplicated list of examples that change the prompt.
     """
-    return PROGRAMMING_EXAMPLES + SPEECH_ERROR_EXAMPLES + TECHNICAL_CORRECTIONS
+    all_examples = get_all_examples()
+    training = {}
+    for example in all_examples:
+        key = normalize_prompt(example.raw_prompt)
+        if key != normalize_prompt(example.corrected_prompt) and key not in training:
+            training[key] = example
+
+    print(f"📚 Using {len(training)} of {len(all_examples)} examples for training "
+          f"({len(all_examples) - len(training)} identity or duplicate pairs skipped)")
+    return list(training.values())
 
 
 def get_examples_by_category(category: str) -> List[dspy.Example]:
@@ -69,19 +154,50 @@ def get_examples_by_category(category: str) -> List[dspy.Example]:
     Get examples by category.
 
     Args:
-        category: Category of examples to return ('programming', 'speech', 'technical')
+        category: Category of examples to return ('programming', 'speech', 'technical', 'all')
 
     Returns:
-        List of examples for the specified category.
+        New list of examples for the specified category; changing it does
+        not change the training set.
+    """
+    if category == "all":
+        return list(get_all_examples())
+
+    return list(_CATEGORIES.get(category, ()))
+
+
+# Category to serialized examples, with the example tuple they were built from
+_example_dicts: Dict[str, Tuple[Tuple[dspy.Example, ...], List[Dict[str, str]]]] = {}
+
+
+def get_example_dicts(category: str = "all") -> List[Dict[str, str]]:
     """
-    categories = {
-        "programming": PROGRAMMING_EXAMPLES,
-        "speech": SPEECH_ERROR_EXAMPLES,
-        "technical": TECHNICAL_CORRECTIONS,
-        "all": get_all_examples()
-    }
+    Get examples as dictionaries for API responses.
 
-    return categories.get(category, [])
+    Like lookup_known_correction, the serialized lists are reused until
+    get_all_examples() returns a new snapshot, so read-heavy endpoints do not
+    rebuild them on every request.
+
+    Args:
+        category: Category of examples to return ('programming', 'speech', 'technical', 'all')
+
+    Returns:
+        List of {"raw_prompt", "corrected_prompt"} dictionaries.
+    """
+    snapshot = get_all_examples()
+    cached = _example_dicts.get(category)
+    if cached is not None and cached[0] is snapshot:
+        return cached[1]
+
+    dicts = [
+        {"raw_prompt": example.raw_prompt, "corrected_prompt": example.corrected_prompt}
+        for example in get_examples_by_category(category)
+    ]
+
+    # Only cache real categories so arbitrary query values cannot grow the table
+    if category == "all" or category in _CATEGORIES:
+        _example_dicts[category] = (snapshot, dicts)
+    return dicts
 
 
 def add_example(raw_prompt: str, corrected_prompt: str, category: str = "programming") -> None:
@@ -93,17 +209,42 @@ def add_example(raw_prompt: str, corrected_prompt: str, category: str = "program
         corrected_prompt: The corrected version
         category: Category to add the example to
     """
-    example = dspy.Example(raw_prompt=raw_prompt, corrected_prompt=corrected_prompt)
+    example = _make_example(raw_prompt, corrected_prompt)
 
-    if category == "programming":
-        PROGRAMMING_EXAMPLES.append(example)
-    elif category == "speech":
-        SPEECH_ERROR_EXAMPLES.append(example)
-    elif category == "technical":
-        TECHNICAL_CORRECTIONS.append(example)
-    else:
+    try:
+        _CATEGORIES[category].append(example)
+    except KeyError:
         raise ValueError(f"Unknown category: {category}")
 
+    get_all_examples.cache_clear()
+
+
+def add_examples(examples: List[Dict[str, str]]) -> int:
+    """
+    Add several examples to the training set at once.
+
+    Every category is checked before anything is added, so an invalid
+    entry leaves the training set unchanged.
+
+    Args:
+        examples: Dictionaries with raw_prompt, corrected_prompt and optional category
+
+    Returns:
+        Number of examples added.
+    """
+    for example in examples:
+        category = example.get("category", "programming")
+        if category not in _CATEGORIES:
+            raise ValueError(f"Unknown category: {category}")
+
+    for example in examples:
+        _CATEGORIES[example.get("category", "programming")].append(
+            _make_example(example["raw_prompt"], example["corrected_prompt"])
+        )
+
+    get_all_examples.cache_clear()
+    return len(examples)
+
 
 def get_example_count() -> Dict[str, int]:
     """
@@ -112,12 +253,9 @@ def get_example_count() -> Dict[str, int]:
     Returns:
         Dictionary with counts for each category.
     """
-    return {
-        "programming": len(PROGRAMMING_EXAMPLES),
-        "speech": len(SPEECH_ERROR_EXAMPLES),
-        "technical": len(TECHNICAL_CORRECTIONS),
-        "total": len(get_all_examples())
-    }
+    counts = {category: len(examples) for category, examples in _CATEGORIES.items()}
+    counts["total"] = sum(counts.values())
+    return counts
 
 
 def convert_dict_to_dspy_examples(examples: List[Dict[str, str]]) -> List[dspy.Example]:
@@ -130,5 +268,4 @@ def convert_dict_to_dspy_examples(examples: List[Dict[str, str]]) -> List[dspy.E
     Returns:
         List of DSPy Example objects
     """
-    return [dspy.Example(raw_prompt=ex["raw_prompt"], corrected_prompt=ex["corrected_prompt"])
-            for ex in examples]
+    return [_make_example(ex["raw_prompt"], ex["corrected_prompt"]) for ex in examples]
@@ -2,8 +2,54 @@
 DSPy signature and prediction module for prompt correction.
 """
 
+import os
+import re
+import json
+import asyncio
+import hashlib
+import contextlib
 import dspy
-from typing import Optional, List, Union
+from typing import AsyncIterator, Optional, List, Union
+
+from .cache import PromptCache
+from .claude_lm import ClaudeLM
+from .examples import lookup_known_correction
+
+# Optimization modules pull in heavy dependencies; import them once up front
+try:
+    from dspy.teleprompt import MIPROv2
+    from dspy.evaluate import EM
+    _HAS_MIPRO = True
+except ImportError as e:
+    print(f"Warning: Could not import optimization modules: {e}")
+    _HAS_MIPRO = False
+
+# Matches one "[n] corrected prompt" line of a batched response
+_BATCH_LINE_RE = re.compile(r"^\s*\[(\d+)\]\s*(.+?)\s*$", re.MULTILINE)
+
+# Characters trimmed from either end of a parsed answer
+_QUOTES_AND_WHITESPACE = " \t\r\n\"'"
+
+_CORRECTION_PREAMBLE = """You are a helpful assistant that corrects programming-related prompts from speech-to-text systems.
+
+Here are some examples of corrections:
+- "frogs in ruby" → "procs in ruby"
+- "rails and rels" → "rails and routes"
+- "how to use cads in ruby" → "how to use procs in ruby"
+"""
+
+# Static instructions are kept byte-identical so the provider can cache the prefix
+_FALLBACK_SYSTEM_PROMPT = _CORRECTION_PREAMBLE + """
+Please correct the following prompt, making it clearer and more accurate for programming queries. \
+Respond with ONLY the corrected prompt, nothing else."""
+
+_FALLBACK_TEMPLATE = """Raw prompt: "{raw_prompt}"
+
+Corrected prompt:"""
+
+_BATCH_SYSTEM_PROMPT = _CORRECTION_PREAMBLE + """
+Please correct each of the following numbered prompts, making them clearer and more accurate for programming \
+queries. Respond with ONLY one line per prompt in the form "[n] corrected prompt", keeping the same numbers and order."""
 
 
 class FixProgrammingPrompt(dspy.Signature):
@@ -32,64 +78,132 @@ class PromptFixer:
     methods for fixing prompts with optional optimization.
     """
 
-    def __init__(self, use_optimization: bool = True):
+    def __init__(self, use_optimization: bool = True, cache: Optional[PromptCache] = None, lm=None,
+                 compiled_dir: Optional[str] = None):
         """
         Initialize the PromptFixer.
 
         Args:
             use_optimization: Whether to use MIPRO optimization for the prediction module
+            cache: Cache for corrected prompts (defaults to an exact-match PromptCache)
+            lm: Language model for direct calls; resolved from DSPy settings on first use if None
+            compiled_dir: Directory where compiled modules are saved, keyed by their
+                training examples, so an unchanged example set is never recompiled
         """
         self.use_optimization = use_optimization
         self.fix_prompt_module = dspy.Predict(FixProgrammingPrompt)
         self.compiled_module = None
-        self.lm = None
+        self.lm = lm
+        self.cache = cache if cache is not None else PromptCache()
+        self.compiled_dir = compiled_dir
 
-    def compile_with_examples(self, examples: List[Union[dict, dspy.Example]]) -> None:
+    def compile_with_examples(self, examples: List[Union[dict, dspy.Example]], compile_lm=None) -> None:
         """
         Compile the prediction module with training examples using MIPRO optimization.
 
         Args:
             examples: List of training examples (can be dict or dspy.Example objects)
+            compile_lm: Optional language model used while compiling instead of
+                dspy.settings.lm, e.g. when compiling in a worker thread before
+                DSPy is configured
         """
         if not self.use_optimization:
             return
 
+        if not _HAS_MIPRO:
+            print("Warning: Optimization modules are unavailable")
+            print("Falling back to basic prediction module")
+            self.use_optimization = False
+            return
+
         try:
-            from dspy.teleprompt import MIPROv2
-            from dspy.evaluate import EM
-
-            # Convert dict examples to dspy.Example objects if needed
-            dspy_examples = []
-            for example in examples:
-                if isinstance(example, dict):
-                    dspy_examples.append(dspy.Example(
-                        raw_prompt=example["raw_prompt"],
-                        corrected_prompt=example["corrected_prompt"]
-                    ))
-                elif isinstance(example, dspy.Example):
-                    dspy_examples.append(example)
-                else:
-                    raise ValueError(f"Invalid example format: {type(example)}")
+            # Use prepared Examples as-is; convert anything else once
+            if all(isinstance(example, dspy.Example) and example._input_keys for example in examples):
+                dspy_examples = list(examples)
+            else:
+                dspy_examples = [self._as_training_example(example) for example in examples]
+
+            compiled_path = self._compiled_path(dspy_examples, compile_lm) if self.compiled_dir else None
+            if compiled_path and os.path.exists(compiled_path):
+                try:
+                    module = dspy.Predict(FixProgrammingPrompt)
+                    module.load(compiled_path)
+                    self.compiled_module = module
+                    self.cache.clear()
+                    print(f"✅ Loaded compiled module from {compiled_path}")
+                    return
+                except Exception as e:
+                    print(f"Warning: Could not load compiled module, recompiling: {e}")
 
             print(f"🔄 Compiling with {len(dspy_examples)} examples...")
 
             # Define scoring function
             metric = EM
-            mipro = MIPROv2(metric=metric)
+            # Evaluate candidates concurrently; the calls are network-bound
+            num_threads = int(os.getenv("DSPY_MIPRO_THREADS", "8"))
+            mipro = MIPROv2(metric=metric, num_threads=num_threads)
 
             # Compile the module
-            self.compiled_module = mipro.compile(self.fix_prompt_module, trainset=dspy_examples)
+            compile_context = dspy.context(lm=compile_lm) if compile_lm is not None else contextlib.nullcontext()
+            with compile_context:
+                self.compiled_module = mipro.compile(self.fix_prompt_module, trainset=dspy_examples)
+            # Cached corrections came from the previous module
+            self.cache.clear()
             print("✅ MIPRO compilation completed successfully")
 
-        except ImportError as e:
-            print(f"Warning: Could not import optimization modules: {e}")
-            print("Falling back to basic prediction module")
-            self.use_optimization = False
+            if compiled_path:
+                self._save_compiled(compiled_path)
+
         except Exception as e:
             print(f"Warning: Error during compilation: {e}")
             print("Falling back to basic prediction module")
             self.use_optimization = False
 
+    def _compiled_path(self, examples: List[dspy.Example], compile_lm=None) -> str:
+        """
+        Get the file a module compiled from these examples is saved to.
+
+        The name also covers the compiling model and the signature, so a
+        module optimized for another model or older instructions is never loaded.
+        """
+        lm = compile_lm or self.lm or dspy.settings.lm
+        payload = json.dumps({
+            "model": getattr(lm, "model", None),
+            "instructions": FixProgrammingPrompt.instructions,
+            "fields": {name: field.json_schema_extra for name, field in FixProgrammingPrompt.fields.items()},
+            "examples": [example.toDict() for example in examples]
+        }, sort_keys=True, default=str)
+        digest = hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+        return os.path.join(self.compiled_dir, f"{digest}.json")
+
+    def _save_compiled(self, path: str) -> None:
+        """
+        Save the compiled module without ever exposing a partial file.
+
+        Concurrent workers may compile the same examples; each writes its own
+        temporary file and the atomic rename makes the last one win.
+        """
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path[:-len('.json')]}.{os.getpid()}.tmp.json"
+            self.compiled_module.save(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Warning: Could not save compiled module: {e}")
+
+    @staticmethod
+    def _as_training_example(example: Union[dict, dspy.Example]) -> dspy.Example:
+        """Convert an example to a dspy.Example with raw_prompt marked as its input."""
+        if isinstance(example, dict):
+            return dspy.Example(
+                raw_prompt=example["raw_prompt"],
+                corrected_prompt=example["corrected_prompt"]
+            ).with_inputs("raw_prompt")
+        elif isinstance(example, dspy.Example):
+            return example if example._input_keys else example.with_inputs("raw_prompt")
+        else:
+            raise ValueError(f"Invalid example format: {type(example)}")
+
     def fix_prompt(self, raw_prompt: str) -> str:
         """
         Fix a raw prompt using the DSPy module.
@@ -103,6 +217,15 @@ class PromptFixer:
         if not raw_prompt or not raw_prompt.strip():
             raise ValueError("Raw prompt cannot be empty")
 
+        # Prompts matching a training example need no LM call
+        known = lookup_known_correction(raw_prompt)
+        if known is not None:
+            return known
+
+        cached = self.cache.get(raw_prompt)
+        if cached is not None:
+            return cached
+
         try:
             # Use compiled module if available, otherwise use basic module
             if self.compiled_module and self.use_optimization:
@@ -110,67 +233,334 @@ class PromptFixer:
             else:
                 result = self.fix_prompt_module(raw_prompt=raw_prompt)
 
-            return result.corrected_prompt
+            corrected = result.corrected_prompt
 
         except Exception as e:
             # Fallback to direct LM call if DSPy structured output fails
             print(f"Warning: DSPy structured output failed, using fallback: {e}")
-            return self._fix_prompt_fallback(raw_prompt)
+            corrected = self._fix_prompt_fallback(raw_prompt)
 
-    def _fix_prompt_fallback(self, raw_prompt: str) -> str:
+        self.cache.put(raw_prompt, corrected)
+        return corrected
+
+    async def afix_prompt(self, raw_prompt: str) -> str:
         """
-        Fallback method that directly calls the language model without DSPy's structured output.
+        Asynchronously fix a raw prompt using the DSPy module.
 
         Args:
-            raw_prompt: The raw prompt to fix
+            raw_prompt: The raw prompt from speech-to-text
 
         Returns:
             The corrected prompt
         """
+        if not raw_prompt or not raw_prompt.strip():
+            raise ValueError("Raw prompt cannot be empty")
+
+        # Prompts matching a training example need no LM call
+        known = lookup_known_correction(raw_prompt)
+        if known is not None:
+            return known
+
+        cached = self.cache.get(raw_prompt)
+        if cached is not None:
+            return cached
+
         try:
-            # Get the language model from DSPy settings
-            lm = dspy.settings.lm
-            if not lm:
-                raise RuntimeError("No language model configured")
+            # Use compiled module if available, otherwise use basic module
+            if self.compiled_module and self.use_optimization:
+                result = await self.compiled_module.acall(raw_prompt=raw_prompt)
+            else:
+                result = await self.fix_prompt_module.acall(raw_prompt=raw_prompt)
 
-            # Create a simple prompt for correction
-            prompt = f"""You are a helpful assistant that corrects programming-related prompts from speech-to-text systems.
+            corrected = result.corrected_prompt
 
-Here are some examples of corrections:
-- "frogs in ruby" → "procs in ruby"
-- "rails and rels" → "rails and routes"
-- "how to use cads in ruby" → "how to use procs in ruby"
+        except Exception as e:
+            # Fallback to direct LM call if DSPy structured output fails
+            print(f"Warning: DSPy structured output failed, using fallback: {e}")
+            corrected = await self._afix_prompt_fallback(raw_prompt)
 
-Please correct the following prompt, making it clearer and more accurate for programming queries. Respond with ONLY the corrected prompt, nothing else.
+        self.cache.put(raw_prompt, corrected)
+        return corrected
 
-Raw prompt: "{raw_prompt}"
+    async def astream_prompt(self, raw_prompt: str) -> AsyncIterator[str]:
+        """
+        Stream a corrected prompt as Claude generates it.
 
-Corrected prompt:"""
+        Known and cached prompts are yielded whole. Otherwise the single-line
+        fallback prompt is streamed from the bound ClaudeLM, since DSPy's
+        structured output cannot be emitted field by field. Surrounding quotes
+        and whitespace are held back, so the deltas join into exactly the
+        corrected prompt. Streamed corrections are not cached, since the
+        fallback prompt skips the compiled module /optimize-prompt answers with.
 
-            # Call the language model directly
-            response = lm(prompt)
+        Args:
+            raw_prompt: The raw prompt from speech-to-text
+
+        Yields:
+            Pieces of the corrected prompt
+        """
+        if not raw_prompt or not raw_prompt.strip():
+            raise ValueError("Raw prompt cannot be empty")
+
+        known = lookup_known_correction(raw_prompt)
+        cached = known if known is not None else self.cache.get(raw_prompt)
+        if cached is not None:
+            yield cached
+            return
+
+        lm = self._get_fallback_lm()
+        if not isinstance(lm, ClaudeLM):
+            yield await self.afix_prompt(raw_prompt)
+            return
 
-            # Extract the corrected prompt from the response
-            # Look for the corrected prompt after "Corrected prompt:"
-            if "Corrected prompt:" in response:
-                corrected = response.split("Corrected prompt:")[-1].strip()
-                # Remove any quotes and extra whitespace
-                corrected = corrected.strip('"').strip("'").strip()
-                return corrected
+        response = ""
+        emitted = ""
+        try:
+            stream = lm.astream(messages=self._build_fallback_messages(raw_prompt), stop_sequences=["\n\n"])
+            async with contextlib.aclosing(stream):
+                async for text in stream:
+                    response += text
+                    line, newline, _ = response.lstrip(_QUOTES_AND_WHITESPACE).partition("\n")
+                    ready = line.rstrip(_QUOTES_AND_WHITESPACE)
+                    if len(ready) > len(emitted):
+                        yield ready[len(emitted):]
+                        emitted = ready
+                    if newline:
+                        break
+        except Exception as e:
+            # Nothing sent yet, so the regular path can still answer
+            if emitted:
+                raise
+            print(f"Warning: Claude streaming failed, using a regular call: {e}")
+
+        if not emitted:
+            yield await self.afix_prompt(raw_prompt)
+
+    async def fix_prompts_async(self, raw_prompts: List[str],
+                                max_concurrency: int = 8) -> List[Union[str, Exception]]:
+        """
+        Fix several raw prompts concurrently.
+
+        Args:
+            raw_prompts: The raw prompts from speech-to-text
+            max_concurrency: Maximum number of in-flight LM calls
+
+        Returns:
+            Corrected prompts in input order; a failed prompt yields its exception
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fix_one(raw_prompt: str) -> str:
+            async with semaphore:
+                return await self.afix_prompt(raw_prompt)
+
+        return await asyncio.gather(*(fix_one(p) for p in raw_prompts), return_exceptions=True)
+
+    def cached_correction(self, raw_prompt: str) -> Optional[str]:
+        """
+        Get a correction that needs no LM call.
+
+        Args:
+            raw_prompt: The raw prompt from speech-to-text
+
+        Returns:
+            The known or cached corrected prompt, or None if it must be fixed
+        """
+        known = lookup_known_correction(raw_prompt)
+        return known if known is not None else self.cache.get(raw_prompt)
+
+    def fix_prompt_batch(self, raw_prompts: List[str], batch_size: int = 8) -> List[str]:
+        """
+        Fix several raw prompts with one LM call per batch.
+
+        Known and cached prompts are answered without a call. The rest are
+        numbered and sent together so the shared instructions are only paid
+        for once per batch, and their answers are cached. If a batch response
+        cannot be parsed or the number of answers does not match, that batch
+        falls back to fixing each prompt individually.
+
+        Args:
+            raw_prompts: The raw prompts from speech-to-text
+            batch_size: Maximum number of prompts per LM call
+
+        Returns:
+            Corrected prompts in input order
+        """
+        for raw_prompt in raw_prompts:
+            if not raw_prompt or not raw_prompt.strip():
+                raise ValueError("Raw prompt cannot be empty")
+
+        corrected = [self.cached_correction(raw_prompt) for raw_prompt in raw_prompts]
+        pending = [i for i, answer in enumerate(corrected) if answer is None]
+
+        for start in range(0, len(pending), batch_size):
+            indices = pending[start:start + batch_size]
+            answers = self._fix_batch([raw_prompts[i] for i in indices])
+            for i, answer in zip(indices, answers):
+                corrected[i] = answer
+
+        return corrected
+
+    async def afix_prompt_batch(self, raw_prompts: List[str],
+                                batch_size: int = 8) -> List[Union[str, Exception]]:
+        """
+        Async counterpart of fix_prompt_batch.
+
+        Args:
+            raw_prompts: The raw prompts from speech-to-text
+            batch_size: Maximum number of prompts per LM call
+
+        Returns:
+            Corrected prompts in input order; a failed prompt yields its exception
+        """
+        corrected = [
+            ValueError("Raw prompt cannot be empty") if not raw_prompt or not raw_prompt.strip()
+            else self.cached_correction(raw_prompt)
+            for raw_prompt in raw_prompts
+        ]
+        pending = [i for i, answer in enumerate(corrected) if answer is None]
+
+        chunks = [pending[start:start + batch_size] for start in range(0, len(pending), batch_size)]
+        results = await asyncio.gather(*(self._afix_batch([raw_prompts[i] for i in indices])
+                                         for indices in chunks))
+        for indices, answers in zip(chunks, results):
+            for i, answer in zip(indices, answers):
+                corrected[i] = answer
+
+        return corrected
+
+    def _fix_batch(self, batch: List[str]) -> List[str]:
+        """Fix uncached prompts with one LM call, falling back to one call each."""
+        if len(batch) > 1:
+            try:
+                response = self._get_fallback_lm()(messages=self._build_batch_messages(batch))
+                answers = self._parse_batch_response(response, len(batch))
+            except Exception as e:
+                print(f"Warning: Batch prompt fixing failed, fixing individually: {e}")
             else:
-                # If the format is unexpected, just return the response
-                # Clean up the response by removing extra text
-                response = response.strip()
-                # Remove any explanatory text and keep only the corrected prompt
-                if "→" in response:
-                    corrected = response.split("→")[-1].strip()
-                    return corrected.strip('"').strip("'").strip()
-                else:
-                    return response
+                for raw_prompt, answer in zip(batch, answers):
+                    self.cache.put(raw_prompt, answer)
+                return answers
+
+        return [self.fix_prompt(raw_prompt) for raw_prompt in batch]
+
+    async def _afix_batch(self, batch: List[str]) -> List[Union[str, Exception]]:
+        """Async counterpart of _fix_batch."""
+        if len(batch) > 1:
+            try:
+                response = await self._get_fallback_lm().acall(messages=self._build_batch_messages(batch))
+                answers = self._parse_batch_response(response, len(batch))
+            except Exception as e:
+                print(f"Warning: Batch prompt fixing failed, fixing individually: {e}")
+            else:
+                for raw_prompt, answer in zip(batch, answers):
+                    self.cache.put(raw_prompt, answer)
+                return answers
+
+        return await self.fix_prompts_async(batch)
+
+    def _fix_prompt_fallback(self, raw_prompt: str) -> str:
+        """
+        Fallback method that directly calls the language model without DSPy's structured output.
+
+        Args:
+            raw_prompt: The raw prompt to fix
+
+        Returns:
+            The corrected prompt
+        """
+        try:
+            # Call the language model directly, stopping after the answer line when supported
+            lm = self._get_fallback_lm()
+            complete = lm.stream_first_line if isinstance(lm, ClaudeLM) else lm
+            response = complete(messages=self._build_fallback_messages(raw_prompt))
+            return self._parse_fallback_response(response)
 
         except Exception as e:
             raise RuntimeError(f"Error in fallback prompt fixing: {str(e)}")
 
+    async def _afix_prompt_fallback(self, raw_prompt: str) -> str:
+        """
+        Async counterpart of _fix_prompt_fallback.
+
+        Args:
+            raw_prompt: The raw prompt to fix
+
+        Returns:
+            The corrected prompt
+        """
+        try:
+            lm = self._get_fallback_lm()
+            complete = lm.astream_first_line if isinstance(lm, ClaudeLM) else lm.acall
+            response = await complete(messages=self._build_fallback_messages(raw_prompt))
+            return self._parse_fallback_response(response)
+
+        except Exception as e:
+            raise RuntimeError(f"Error in fallback prompt fixing: {str(e)}")
+
+    def _get_fallback_lm(self):
+        """Get the bound language model, resolving it from DSPy settings once."""
+        if self.lm is None:
+            lm = dspy.settings.lm
+            if not lm:
+                raise RuntimeError("No language model configured")
+            self.lm = lm
+        return self.lm
+
+    @staticmethod
+    def _build_fallback_messages(raw_prompt: str) -> List[dict]:
+        """Create the messages for a single prompt correction."""
+        return [
+            {"role": "system", "content": _FALLBACK_SYSTEM_PROMPT},
+            {"role": "user", "content": _FALLBACK_TEMPLATE.format(raw_prompt=raw_prompt)}
+        ]
+
+    @staticmethod
+    def _build_batch_messages(raw_prompts: List[str]) -> List[dict]:
+        """Create the messages for correcting several numbered prompts at once."""
+        numbered = "\n".join(f"[{i}] {raw_prompt}" for i, raw_prompt in enumerate(raw_prompts, 1))
+        return [
+            {"role": "system", "content": _BATCH_SYSTEM_PROMPT},
+            {"role": "user", "content": numbered}
+        ]
+
+    @staticmethod
+    def _parse_batch_response(response, expected: int) -> List[str]:
+        """Extract numbered corrected prompts from a batched LM response."""
+        if isinstance(response, list):
+            response = response[0] if response else ""
+
+        answers = {}
+        for match in _BATCH_LINE_RE.finditer(response):
+            answers[int(match.group(1))] = match.group(2).strip(_QUOTES_AND_WHITESPACE)
+
+        if sorted(answers) != list(range(1, expected + 1)):
+            raise ValueError(f"Expected {expected} numbered answers, got {len(answers)}")
+
+        return [answers[i] for i in range(1, expected + 1)]
+
+    @staticmethod
+    def _parse_fallback_response(response) -> str:
+        """Extract the corrected prompt from a raw LM response."""
+        # dspy.LM and ClaudeLM.acall return a list of completions; ClaudeLM's sync call returns a string
+        if isinstance(response, list):
+            response = response[0] if response else ""
+
+        # Look for the corrected prompt after "Corrected prompt:"
+        _, marker, corrected = response.rpartition("Corrected prompt:")
+        if marker:
+            # Remove any quotes and extra whitespace
+            return corrected.strip(_QUOTES_AND_WHITESPACE)
+
+        # If the format is unexpected, just return the response
+        # Clean up the response by removing extra text
+        response = response.strip()
+        # Remove any explanatory text and keep only the corrected prompt
+        _, arrow, corrected = response.rpartition("→")
+        if arrow:
+            return corrected.strip(_QUOTES_AND_WHITESPACE)
+        return response
+
     def get_module_info(self) -> dict:
         """
         Get information about the current module configuration.
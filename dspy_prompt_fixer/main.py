@@ -3,29 +3,90 @@ Main FastAPI application for DSPy prompt correction microservice.
 """
 
 import os
-from typing import Dict, List, Optional
-from fastapi import FastAPI, HTTPException, Depends
+import asyncio
+import contextlib
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Tuple
+import anyio.to_thread
+import orjson
+from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipResponder
 import dspy
 
-from .claude_lm import ClaudeLM
+from .claude_lm import ClaudeLM, get_configured_model, reset_clients
 from .fix_module import PromptFixer
-from .examples import get_all_examples, get_examples_by_category, add_example, get_example_count
+from .cache import PromptCache, load_default_embedder
+from .scheduler import BatchScheduler, MAX_BATCH, MAX_DELAY_MS, MAX_CONCURRENCY
+from .examples import (
+    get_example_dicts,
+    get_training_examples,
+    add_example,
+    add_examples,
+    get_example_count
+)
 
 # Load environment variables
 from dotenv import load_dotenv
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize DSPy before serving and clean up on shutdown."""
+    await startup_event()
+    yield
+    await shutdown_event()
+
+
+class _EventStreamGZipResponder(GZipResponder):
+    """GZipResponder that passes text/event-stream responses through as sent."""
+
+    async def send_with_gzip(self, message) -> None:
+        if message["type"] == "http.response.start":
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            if content_type.startswith("text/event-stream"):
+                self.started = True
+                self.content_encoding_set = True
+                await self.send(message)
+                return
+        await super().send_with_gzip(message)
+
+
+class EventStreamGZipMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware that leaves server-sent events uncompressed.
+
+    Compressing an event stream holds each event in the compressor until
+    enough output builds up, so clients would not see events as they are sent.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "http" and "gzip" in Headers(scope=scope).get("Accept-Encoding", ""):
+            responder = _EventStreamGZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+            await responder(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="DSPy Prompt Correction Microservice",
     description="A microservice that uses DSPy to fix ambiguous or incorrect prompts from speech-to-text systems",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
+# Compress large responses such as the full example list
+app.add_middleware(EventStreamGZipMiddleware, minimum_size=1024)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -38,6 +99,25 @@ app.add_middleware(
 # Global variables for DSPy setup
 claude_lm = None
 prompt_fixer = None
+batch_scheduler = None
+
+# Serializes example writes and (re)initialization
+examples_lock = asyncio.Lock()
+
+# Serializes recompiles; held while compiling, so example writes never wait on it
+recompile_lock = asyncio.Lock()
+
+# Debounced recompilation: new examples mark the module dirty and a
+# background task recompiles once the delay passes or enough have arrived
+examples_dirty = asyncio.Event()
+recompile_due = asyncio.Event()
+pending_examples = 0
+recompile_task = None
+
+# Last /health payload with the (claude_lm, prompt_fixer) it describes,
+# refreshed by a background task so frequent probes skip recomputing it
+health_snapshot = None
+health_task = None
 
 # Pydantic models
 
@@ -57,6 +137,10 @@ class ExampleRequest(BaseModel):
     category: str = Field("programming", description="Category for the example")
 
 
+class ExampleBatchRequest(BaseModel):
+    examples: List[ExampleRequest] = Field(..., description="Examples to add")
+
+
 class HealthResponse(BaseModel):
     status: str = Field(..., description="Service status")
     dspy_configured: bool = Field(..., description="Whether DSPy is properly configured")
@@ -68,29 +152,155 @@ class StatsResponse(BaseModel):
     total_examples: int = Field(..., description="Total number of training examples")
     categories: Dict[str, int] = Field(..., description="Examples by category")
     module_info: Dict = Field(..., description="DSPy module information")
+    cache_info: Dict = Field(..., description="Corrected-prompt cache size and hit rate")
 
 
-def initialize_dspy():
-    """Initialize DSPy with Claude language model."""
-    global claude_lm, prompt_fixer
+def create_prompt_cache(load_file: bool = False) -> PromptCache:
+    """
+    Create the corrected-prompt cache from environment configuration.
+
+    Args:
+        load_file: Restore entries saved to DSPY_CACHE_FILE (only on startup)
+
+    Returns:
+        The prompt cache
+    """
+    semantic = os.getenv("DSPY_SEMANTIC_CACHE", "false").lower() == "true"
+    ttl = float(os.getenv("DSPY_CACHE_TTL", "3600"))
+    cache = PromptCache(
+        maxsize=int(os.getenv("DSPY_CACHE_SIZE", "4096")),
+        similarity_threshold=float(os.getenv("DSPY_SEMANTIC_CACHE_THRESHOLD", "0.92")),
+        embedder=load_default_embedder() if semantic else None,
+        ttl=ttl if ttl > 0 else None
+    )
+
+    cache_file = os.getenv("DSPY_CACHE_FILE")
+    if load_file and cache_file and os.path.exists(cache_file):
+        try:
+            cache.load(cache_file)
+        except Exception as e:
+            print(f"Warning: Could not load prompt cache: {e}")
+
+    return cache
+
+
+def lookup_queued_prompt(raw_prompt: str) -> Optional[str]:
+    """Answer a known or cached prompt before the scheduler queues it."""
+    fixer = prompt_fixer
+    if not fixer or not raw_prompt or not raw_prompt.strip():
+        return None
+    return fixer.cached_correction(raw_prompt)
+
+
+async def fix_queued_prompts(raw_prompts: List[str]) -> List:
+    """Fix a batch collected by the scheduler with one Claude call."""
+    fixer = prompt_fixer
+    if not fixer:
+        return [RuntimeError("DSPy not initialized")] * len(raw_prompts)
+    # The scheduler already caps the batch size
+    return await fixer.afix_prompt_batch(raw_prompts, batch_size=len(raw_prompts))
+
+
+def optimization_enabled() -> bool:
+    """Whether the prompt fixer is compiled with MIPRO (DSPY_USE_OPTIMIZATION)."""
+    return os.getenv("DSPY_USE_OPTIMIZATION", "false").lower() == "true"
+
+
+def create_prompt_fixer(lm: ClaudeLM, cache: PromptCache) -> PromptFixer:
+    """
+    Create an uncompiled prompt fixer configured from the environment.
+
+    Args:
+        lm: Language model the fixer answers with
+        cache: Prompt cache for the fixer
+
+    Returns:
+        The prompt fixer
+    """
+    return PromptFixer(
+        use_optimization=optimization_enabled(),
+        cache=cache,
+        lm=lm,
+        compiled_dir=os.getenv("DSPY_COMPILED_DIR")
+    )
+
+
+def build_prompt_fixer(cache: Optional[PromptCache] = None,
+                       load_cache: bool = False) -> Tuple[ClaudeLM, PromptFixer]:
+    """
+    Build and compile a Claude language model and prompt fixer.
+
+    Blocking; runs in a worker thread and touches no shared state.
+
+    Args:
+        cache: Prompt cache for the fixer; a new one is created if omitted
+        load_cache: Restore the new cache from DSPY_CACHE_FILE
+
+    Returns:
+        The language model and the compiled prompt fixer
+    """
+    # Initialize Claude language model
+    lm = ClaudeLM(
+        api_key=os.getenv("ANTHROPIC_API_KEY"),
+        model=get_configured_model()
+    )
+
+    # Initialize prompt fixer
+    fixer = create_prompt_fixer(lm, cache if cache is not None else create_prompt_cache(load_cache))
+
+    # Get training examples and compile against the new model
+    examples = get_training_examples()
+    if examples:
+        fixer.compile_with_examples(examples, compile_lm=lm)
+
+    return lm, fixer
+
+
+def precompile_prompt_fixer() -> bool:
+    """
+    Compile and save the prompt fixer before worker processes are forked.
+
+    Workers then load the saved module from DSPY_COMPILED_DIR instead of
+    each compiling their own.
+
+    Returns:
+        True if a compiled module is saved, False if optimization is
+        disabled, no DSPY_COMPILED_DIR is set or compiling failed
+    """
+    if not optimization_enabled() or not os.getenv("DSPY_COMPILED_DIR"):
+        return False
 
     try:
-        # Initialize Claude language model
-        claude_lm = ClaudeLM(
-            api_key=os.getenv("ANTHROPIC_API_KEY"),
-            model=os.getenv("CLAUDE_MODEL", "claude-3-opus-20240229")
-        )
+        # A plain cache; the configured one is only needed by the workers
+        _, fixer = build_prompt_fixer(cache=PromptCache())
+    finally:
+        # Forked workers must open their own connection pools
+        reset_clients()
 
-        # Configure DSPy settings
-        dspy.settings.configure(lm=claude_lm)
+    return fixer.compiled_module is not None
 
-        # Initialize prompt fixer
-        prompt_fixer = PromptFixer(use_optimization=False)  # Disable optimization temporarily
 
-        # Get training examples and compile
-        examples = get_all_examples()
-        if examples:
-            prompt_fixer.compile_with_examples(examples)
+async def initialize_dspy(load_cache: bool = False):
+    """
+    Initialize DSPy with Claude language model.
+
+    Args:
+        load_cache: Restore the prompt cache from DSPY_CACHE_FILE; only done
+            on startup, so a reinitialize starts from an empty cache
+    """
+    global claude_lm, prompt_fixer
+
+    try:
+        async with examples_lock:
+            clear_pending_recompile()
+            lm, fixer = await anyio.to_thread.run_sync(build_prompt_fixer, None, load_cache)
+
+            # dspy.settings may only be changed from the thread that first
+            # configured it, so configure here on the event loop thread
+            dspy.settings.configure(lm=lm)
+
+            # Swap in the fully built pair; requests never see a partial one
+            claude_lm, prompt_fixer = lm, fixer
 
         print("✅ DSPy initialized successfully")
         return True
@@ -100,10 +310,146 @@ def initialize_dspy():
         return False
 
 
-@app.on_event("startup")
+def request_recompile(added: int = 1):
+    """
+    Mark the compiled module stale after examples were added.
+
+    Args:
+        added: Number of examples added
+    """
+    global pending_examples
+
+    pending_examples += added
+    examples_dirty.set()
+    if pending_examples >= int(os.getenv("DSPY_RECOMPILE_BATCH", "50")):
+        recompile_due.set()
+
+
+def clear_pending_recompile():
+    """Forget pending examples once a compile is about to pick them up."""
+    global pending_examples
+
+    examples_dirty.clear()
+    recompile_due.clear()
+    pending_examples = 0
+
+
+async def recompile_examples():
+    """
+    Recompile the prompt fixer against the current training examples.
+
+    The examples are snapshotted under the examples lock, then a new fixer
+    is compiled outside it and swapped in, so adding examples never waits
+    for a compile and a failed compile leaves the serving fixer in place.
+    """
+    global prompt_fixer
+
+    async with recompile_lock:
+        async with examples_lock:
+            clear_pending_recompile()
+            lm, current = claude_lm, prompt_fixer
+            examples = get_training_examples()
+
+        if not current:
+            return
+
+        fixer = create_prompt_fixer(lm, current.cache)
+        await anyio.to_thread.run_sync(lambda: fixer.compile_with_examples(examples, compile_lm=lm))
+        # compile_with_examples turns optimization off when compiling fails
+        if optimization_enabled() and not fixer.use_optimization:
+            raise RuntimeError("Compiling failed, keeping the current module")
+
+        # A reinitialize while compiling already built from every example
+        if prompt_fixer is current:
+            prompt_fixer = fixer
+            # New demonstrations can change answers for already cached prompts
+            fixer.cache.clear()
+
+
+async def recompile_worker():
+    """Recompile at most once per debounce window while examples keep arriving."""
+    delay = float(os.getenv("DSPY_RECOMPILE_DELAY", "30"))
+
+    while True:
+        await examples_dirty.wait()
+        try:
+            await asyncio.wait_for(recompile_due.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+
+        try:
+            await recompile_examples()
+        except Exception as e:
+            print(f"Warning: Background recompile failed: {e}")
+
+
+def compute_health() -> Dict:
+    """Build the /health payload from the current state."""
+    lm, fixer = claude_lm, prompt_fixer
+    dspy_configured = lm is not None and fixer is not None
+
+    return {
+        "status": "healthy" if dspy_configured else "unhealthy",
+        "dspy_configured": dspy_configured,
+        "example_count": get_example_count(),
+        "model_info": lm.get_config() if lm else None
+    }
+
+
+async def refresh_health():
+    """Recompute the health snapshot on a fixed interval."""
+    global health_snapshot
+
+    interval = float(os.getenv("DSPY_HEALTH_INTERVAL", "5"))
+    while True:
+        try:
+            health_snapshot = (claude_lm, prompt_fixer, compute_health())
+        except Exception as e:
+            print(f"Warning: Could not refresh health snapshot: {e}")
+        await asyncio.sleep(interval)
+
+
 async def startup_event():
     """Initialize DSPy on startup."""
-    initialize_dspy()
+    # asyncio primitives bind to the loop that first waits on them; give each
+    # serving loop its own so a restarted app never inherits a dead loop's
+    global examples_lock, recompile_lock, examples_dirty, recompile_due
+    examples_lock = asyncio.Lock()
+    recompile_lock = asyncio.Lock()
+    examples_dirty = asyncio.Event()
+    recompile_due = asyncio.Event()
+
+    await initialize_dspy(load_cache=True)
+
+    global batch_scheduler, recompile_task, health_task
+    recompile_task = asyncio.create_task(recompile_worker())
+    health_task = asyncio.create_task(refresh_health())
+
+    batch_scheduler = BatchScheduler(
+        fix_queued_prompts,
+        max_batch=int(os.getenv("DSPY_MAX_BATCH", str(MAX_BATCH))),
+        max_delay_ms=float(os.getenv("DSPY_BATCH_DELAY_MS", str(MAX_DELAY_MS))),
+        max_concurrency=int(os.getenv("DSPY_BATCH_CONCURRENCY", str(MAX_CONCURRENCY))),
+        lookup=lookup_queued_prompt
+    )
+    batch_scheduler.start()
+
+
+async def shutdown_event():
+    """Stop background work and persist the prompt cache on shutdown."""
+    for task in (recompile_task, health_task):
+        if task:
+            task.cancel()
+
+    if batch_scheduler:
+        await batch_scheduler.stop()
+
+    cache_file = os.getenv("DSPY_CACHE_FILE")
+    if cache_file and prompt_fixer:
+        try:
+            prompt_fixer.cache.save(cache_file)
+        except Exception as e:
+            print(f"Warning: Could not save prompt cache: {e}")
 
 
 @app.get("/", response_model=Dict[str, str])
@@ -117,21 +463,33 @@ async def root():
     }
 
 
-@app.get("/health", response_model=HealthResponse)
+# Hot endpoints build their JSON directly; the models only document the
+# response shape, so FastAPI skips validating and re-serializing them
+@app.get("/health", responses={200: {"model": HealthResponse}})
 async def health_check():
-    """Health check endpoint."""
-    dspy_configured = claude_lm is not None and prompt_fixer is not None
-    model_info = claude_lm.get_config() if claude_lm else None
-
-    return HealthResponse(
-        status="healthy" if dspy_configured else "unhealthy",
-        dspy_configured=dspy_configured,
-        example_count=get_example_count(),
-        model_info=model_info
-    )
+    """
+    Health check endpoint.
+
+    Served from a snapshot refreshed every few seconds; use /ready for a
+    live answer.
+    """
+    snapshot = health_snapshot
+    # A reinitialize since the last refresh makes the snapshot stale
+    if snapshot is not None and snapshot[0] is claude_lm and snapshot[1] is prompt_fixer:
+        return ORJSONResponse(snapshot[2])
+
+    return ORJSONResponse(compute_health())
+
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness check answered from the live state."""
+    if not prompt_fixer:
+        return ORJSONResponse({"ready": False}, status_code=503)
+    return ORJSONResponse({"ready": True})
 
 
-@app.post("/optimize-prompt", response_model=PromptResponse)
+@app.post("/optimize-prompt", responses={200: {"model": PromptResponse}})
 async def optimize_prompt(request: PromptRequest):
     """
     Optimize a raw prompt using DSPy.
@@ -139,16 +497,21 @@ async def optimize_prompt(request: PromptRequest):
     This endpoint takes a raw prompt from speech-to-text and returns
     a corrected version using DSPy optimization.
     """
-    if not prompt_fixer:
+    fixer = prompt_fixer
+    if not fixer:
         raise HTTPException(status_code=503, detail="DSPy not initialized")
 
     try:
-        corrected_prompt = prompt_fixer.fix_prompt(request.raw_prompt)
+        # Await the AsyncAnthropic-backed path so requests share one connection pool
+        if batch_scheduler:
+            corrected_prompt = await batch_scheduler.submit(request.raw_prompt)
+        else:
+            corrected_prompt = await fixer.afix_prompt(request.raw_prompt)
 
-        return PromptResponse(
-            corrected_prompt=corrected_prompt,
-            confidence=None  # DSPy doesn't provide confidence scores by default
-        )
+        return ORJSONResponse({
+            "corrected_prompt": corrected_prompt,
+            "confidence": None  # DSPy doesn't provide confidence scores by default
+        })
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -156,7 +519,50 @@ async def optimize_prompt(request: PromptRequest):
         raise HTTPException(status_code=500, detail=f"Error processing prompt: {str(e)}")
 
 
-@app.get("/examples", response_model=Dict[str, List[Dict[str, str]]])
+def sse_event(data: Dict) -> bytes:
+    """Encode one server-sent event."""
+    return b"data: " + orjson.dumps(data) + b"\n\n"
+
+
+@app.post("/optimize-prompt/stream")
+async def optimize_prompt_stream(request: PromptRequest, http_request: Request):
+    """
+    Optimize a raw prompt, streaming the correction as server-sent events.
+
+    Each event carries a {"delta": ...} piece of the corrected prompt; the
+    last one carries the complete {"corrected_prompt": ...}. If generation
+    fails midway an {"error": ...} event ends the stream. Disconnecting
+    stops the Claude call.
+    """
+    fixer = prompt_fixer
+    if not fixer:
+        raise HTTPException(status_code=503, detail="DSPy not initialized")
+
+    # Validate before the 200 status and headers are sent
+    if not request.raw_prompt or not request.raw_prompt.strip():
+        raise HTTPException(status_code=400, detail="Raw prompt cannot be empty")
+
+    async def events():
+        chunks = []
+        stream = fixer.astream_prompt(request.raw_prompt)
+        try:
+            async with contextlib.aclosing(stream):
+                async for delta in stream:
+                    if await http_request.is_disconnected():
+                        return
+                    chunks.append(delta)
+                    yield sse_event({"delta": delta})
+        except Exception as e:
+            yield sse_event({"error": f"Error processing prompt: {str(e)}"})
+            return
+
+        yield sse_event({"corrected_prompt": "".join(chunks)})
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+
+@app.get("/examples", responses={200: {"model": Dict[str, List[Dict[str, str]]]}})
 async def get_examples(category: Optional[str] = None):
     """
     Get training examples.
@@ -164,23 +570,9 @@ async def get_examples(category: Optional[str] = None):
     Args:
         category: Optional category filter ('programming', 'speech', 'technical', 'all')
     """
-    if category:
-        examples = get_examples_by_category(category)
-    else:
-        examples = get_all_examples()
+    example_dicts = get_example_dicts(category or "all")
 
-    # Convert DSPy Example objects back to dictionaries for API response
-    example_dicts = []
-    for example in examples:
-        if hasattr(example, 'raw_prompt') and hasattr(example, 'corrected_prompt'):
-            example_dicts.append({
-                "raw_prompt": example.raw_prompt,
-                "corrected_prompt": example.corrected_prompt
-            })
-        elif isinstance(example, dict):
-            example_dicts.append(example)
-
-    return {"examples": example_dicts}
+    return ORJSONResponse({"examples": example_dicts})
 
 
 @app.post("/examples", response_model=Dict[str, str])
@@ -189,18 +581,17 @@ async def add_training_example(request: ExampleRequest):
     Add a new training example.
 
     This endpoint allows adding new examples to improve the model's performance.
+    The model is recompiled in the background; use /recompile to apply
+    new examples immediately.
     """
     try:
-        add_example(
-            raw_prompt=request.raw_prompt,
-            corrected_prompt=request.corrected_prompt,
-            category=request.category
-        )
-
-        # Recompile the model with new examples
-        if prompt_fixer:
-            examples = get_all_examples()
-            prompt_fixer.compile_with_examples(examples)
+        async with examples_lock:
+            add_example(
+                raw_prompt=request.raw_prompt,
+                corrected_prompt=request.corrected_prompt,
+                category=request.category
+            )
+            request_recompile()
 
         return {"message": "Example added successfully"}
 
@@ -210,23 +601,59 @@ async def add_training_example(request: ExampleRequest):
         raise HTTPException(status_code=500, detail=f"Error adding example: {str(e)}")
 
 
-@app.get("/stats", response_model=StatsResponse)
+@app.post("/examples/batch", response_model=Dict[str, str])
+async def add_training_examples(request: ExampleBatchRequest):
+    """
+    Add several training examples at once.
+
+    Nothing is added if any example has an unknown category.
+    """
+    try:
+        async with examples_lock:
+            added = add_examples([example.model_dump() for example in request.examples])
+            request_recompile(added)
+
+        return {"message": f"Added {added} examples"}
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error adding examples: {str(e)}")
+
+
+@app.post("/recompile", response_model=Dict[str, str])
+async def recompile():
+    """Recompile the model with all current examples right away."""
+    if not prompt_fixer:
+        raise HTTPException(status_code=503, detail="DSPy not initialized")
+
+    try:
+        await recompile_examples()
+        return {"message": "DSPy recompiled successfully"}
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error recompiling: {str(e)}")
+
+
+@app.get("/stats", responses={200: {"model": StatsResponse}})
 async def get_stats():
     """Get service statistics."""
-    if not prompt_fixer:
+    fixer = prompt_fixer
+    if not fixer:
         raise HTTPException(status_code=503, detail="DSPy not initialized")
 
     example_counts = get_example_count()
 
-    return StatsResponse(
-        total_examples=example_counts["total"],
-        categories={
+    return ORJSONResponse({
+        "total_examples": example_counts["total"],
+        "categories": {
             "programming": example_counts["programming"],
             "speech": example_counts["speech"],
             "technical": example_counts["technical"]
         },
-        module_info=prompt_fixer.get_module_info()
-    )
+        "module_info": fixer.get_module_info(),
+        "cache_info": fixer.cache.stats()
+    })
 
 
 @app.post("/reinitialize")
@@ -238,7 +665,7 @@ async def reinitialize_dspy():
     adding new examples or changing configuration.
     """
     try:
-        success = initialize_dspy()
+        success = await initialize_dspy()
         if success:
             return {"message": "DSPy reinitialized successfully"}
         else:
@@ -259,5 +686,8 @@ if __name__ == "__main__":
         host=host,
         port=port,
         reload=debug,
+        # "auto" uses uvloop and httptools when installed (not on Windows)
+        loop="auto",
+        http="auto",
         log_level="info"
     )
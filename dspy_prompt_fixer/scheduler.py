@@ -0,0 +1,148 @@
+"""
+Micro-batching of concurrent prompt corrections.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, List, Optional, Set, Tuple, Union
+
+# Fixes a batch of raw prompts; a failed prompt yields its exception in place
+BatchFixer = Callable[[List[str]], Awaitable[List[Union[str, Exception]]]]
+
+# Answers a raw prompt without the fixer, or returns None
+PromptLookup = Callable[[str], Optional[str]]
+
+MAX_BATCH = 32
+MAX_DELAY_MS = 15
+MAX_CONCURRENCY = 8
+
+
+class BatchScheduler:
+    """
+    Collect prompts arriving close together and fix them as one batch.
+
+    Callers submit a prompt and await its correction; prompts the lookup
+    can answer never enter the queue. A background task takes the first
+    queued prompt and, once a dispatch slot is free, adds whatever else is
+    queued. An idle scheduler dispatches right away; while other batches
+    are in flight it keeps collecting until the batch is full or the delay
+    window closes.
+    """
+
+    def __init__(self, fix_batch: BatchFixer, max_batch: int = MAX_BATCH,
+                 max_delay_ms: float = MAX_DELAY_MS, max_concurrency: int = MAX_CONCURRENCY,
+                 lookup: Optional[PromptLookup] = None):
+        """
+        Initialize the BatchScheduler.
+
+        Args:
+            fix_batch: Coroutine function fixing a list of raw prompts
+            max_batch: Maximum number of prompts per batch
+            max_delay_ms: How long a batch waits to fill under load, in milliseconds
+            max_concurrency: Maximum number of batches being fixed at once
+            lookup: Optional function answering a prompt without queueing it
+        """
+        self.fix_batch = fix_batch
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self.lookup = lookup
+        self._queue: "asyncio.Queue[Tuple[str, asyncio.Future]]" = asyncio.Queue()
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        """Start collecting batches on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop collecting batches and fail any prompts still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Batch scheduler stopped"))
+
+    async def submit(self, raw_prompt: str) -> str:
+        """
+        Queue a prompt and wait for its correction.
+
+        Args:
+            raw_prompt: The raw prompt from speech-to-text
+
+        Returns:
+            The corrected prompt
+        """
+        if self.lookup is not None:
+            answer = self.lookup(raw_prompt)
+            if answer is not None:
+                return answer
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((raw_prompt, future))
+        return await future
+
+    async def _run(self) -> None:
+        """Collect batches forever, dispatching each without waiting for it."""
+        loop = asyncio.get_running_loop()
+        batch: List[Tuple[str, asyncio.Future]] = []
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                # Only hold a batch open while others are being fixed
+                deadline = loop.time() + (self.max_delay if self._inflight else 0)
+
+                # Prompts keep queueing while every slot is busy
+                await self._slots.acquire()
+                await self._fill(batch, deadline)
+
+                task = asyncio.create_task(self._dispatch(batch))
+                self._inflight.add(task)
+                task.add_done_callback(self._inflight.discard)
+                batch = []
+        except asyncio.CancelledError:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError("Batch scheduler stopped"))
+            raise
+
+    async def _fill(self, batch: List[Tuple[str, asyncio.Future]], deadline: float) -> None:
+        """Add queued prompts to the batch until it is full or the deadline passes."""
+        loop = asyncio.get_running_loop()
+        while len(batch) < self.max_batch:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                return
+
+    async def _dispatch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """Fix one batch and resolve each caller's future."""
+        try:
+            results = await self.fix_batch([raw_prompt for raw_prompt, _ in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+        finally:
+            self._slots.release()
+
+        for (_, future), result in zip(batch, results):
+            # The caller may have gone away (e.g. client disconnect)
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
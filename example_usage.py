@@ -17,24 +17,36 @@ class DSPyPromptClient:
 
     def __init__(self, base_url: str = "http://localhost:8000"):
         self.base_url = base_url.rstrip('/')
+        # One session keeps connections alive across calls
+        self.session = requests.Session()
+
+    def __enter__(self) -> "DSPyPromptClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close pooled connections."""
+        self.session.close()
 
     def health_check(self) -> Dict[str, Any]:
         """Check if the service is healthy."""
-        response = requests.get(f"{self.base_url}/health")
+        response = self.session.get(f"{self.base_url}/health")
         response.raise_for_status()
         return response.json()
 
     def optimize_prompt(self, raw_prompt: str) -> Dict[str, Any]:
         """Optimize a raw prompt using DSPy."""
         payload = {"raw_prompt": raw_prompt}
-        response = requests.post(f"{self.base_url}/optimize-prompt", json=payload)
+        response = self.session.post(f"{self.base_url}/optimize-prompt", json=payload)
         response.raise_for_status()
         return response.json()
 
     def get_examples(self, category: str = None) -> Dict[str, Any]:
         """Get training examples."""
         params = {"category": category} if category else {}
-        response = requests.get(f"{self.base_url}/examples", params=params)
+        response = self.session.get(f"{self.base_url}/examples", params=params)
         response.raise_for_status()
         return response.json()
 
@@ -45,19 +57,19 @@ class DSPyPromptClient:
             "corrected_prompt": corrected_prompt,
             "category": category
         }
-        response = requests.post(f"{self.base_url}/examples", json=payload)
+        response = self.session.post(f"{self.base_url}/examples", json=payload)
         response.raise_for_status()
         return response.json()
 
     def get_stats(self) -> Dict[str, Any]:
         """Get service statistics."""
-        response = requests.get(f"{self.base_url}/stats")
+        response = self.session.get(f"{self.base_url}/stats")
         response.raise_for_status()
         return response.json()
 
     def reinitialize(self) -> Dict[str, Any]:
         """Reinitialize DSPy with current configuration."""
-        response = requests.post(f"{self.base_url}/reinitialize")
+        response = self.session.post(f"{self.base_url}/reinitialize")
         response.raise_for_status()
         return response.json()
 
@@ -68,8 +80,12 @@ def main():
     print("="*60)
 
     # Initialize client
-    client = DSPyPromptClient()
+    with DSPyPromptClient() as client:
+        run_examples(client)
+
 
+def run_examples(client: DSPyPromptClient):
+    """Walk through the service endpoints with one client."""
     # Check if service is running
     print("\n1. Checking service health...")
     try:
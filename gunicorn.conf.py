@@ -0,0 +1,38 @@
+"""
+Gunicorn configuration for DSPy Prompt Correction Microservice.
+
+Usage:
+    gunicorn -c gunicorn.conf.py dspy_prompt_fixer.main:app
+"""
+
+import os
+import tempfile
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8000')}"
+# Examples and the prompt cache are per process; more workers are opt-in
+workers = int(os.getenv("WORKERS", "1"))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Workers load compiled modules from here instead of each compiling its own
+os.environ.setdefault("DSPY_COMPILED_DIR", os.path.join(tempfile.gettempdir(), "dspy_compiled"))
+
+
+def on_starting(server):
+    """Compile once in the master so every worker starts from the saved module."""
+    from dspy_prompt_fixer.main import optimization_enabled, precompile_prompt_fixer
+
+    if not optimization_enabled():
+        server.log.info("DSPy optimization is disabled, nothing to precompile")
+        return
+
+    try:
+        if precompile_prompt_fixer():
+            server.log.info("DSPy module compiled into %s", os.environ["DSPY_COMPILED_DIR"])
+        else:
+            server.log.warning("DSPy module was not compiled, workers will compile")
+    except Exception as e:
+        server.log.warning("Could not precompile DSPy module, workers will compile: %s", e)
@@ -3,11 +3,15 @@
 Test runner script for DSPy Prompt Correction Microservice.
 """
 
+import hashlib
 import subprocess
 import sys
 import os
 from pathlib import Path
 
+# Records which requirements.txt the current environment was installed from
+REQUIREMENTS_SENTINEL = Path(sys.prefix) / ".requirements_hash"
+
 
 def run_command(command, description):
     """Run a command and handle errors."""
@@ -28,6 +32,32 @@ def run_command(command, description):
         return False
 
 
+def requirements_hash():
+    """Hash requirements.txt so unchanged requirements skip pip."""
+    return hashlib.sha256(Path("requirements.txt").read_bytes()).hexdigest()
+
+
+def install_requirements():
+    """Install requirements unless this environment already has them."""
+    current = requirements_hash()
+    try:
+        if REQUIREMENTS_SENTINEL.read_text().strip() == current:
+            print("✅ Dependencies up to date, skipping install")
+            return True
+    except OSError:
+        pass
+
+    if not run_command([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"],
+                       "Installing dependencies"):
+        return False
+
+    try:
+        REQUIREMENTS_SENTINEL.write_text(current)
+    except OSError as e:
+        print(f"⚠️  Could not record installed requirements: {e}")
+    return True
+
+
 def main():
     """Main test runner function."""
     print("🧪 DSPy Prompt Correction Microservice - Test Runner")
@@ -40,8 +70,7 @@ def main():
 
     # Install dependencies if needed
     print("\n📦 Checking dependencies...")
-    if not run_command([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"],
-                       "Installing dependencies"):
+    if not install_requirements():
         print("❌ Failed to install dependencies")
         sys.exit(1)
 
@@ -5,6 +5,7 @@ Virtual Environment Setup Script for DSPy Prompt Correction Microservice.
 
 import os
 import sys
+import hashlib
 import subprocess
 import platform
 from pathlib import Path
@@ -43,6 +44,13 @@ def get_venv_activate_command():
         return "source venv/bin/activate"
 
 
+def get_venv_python(venv_path):
+    """Return the path of the Python interpreter inside the virtual environment."""
+    if platform.system().lower() == "windows":
+        return venv_path / "Scripts" / "python.exe"
+    return venv_path / "bin" / "python"
+
+
 def main():
     print("🐍 DSPy Prompt Correction Microservice - Virtual Environment Setup")
     print("="*70)
@@ -69,15 +77,15 @@ def main():
         sys.exit(1)
     activate_cmd = get_venv_activate_command()
     print("\n📦 Installing dependencies...")
-    if platform.system().lower() == "windows":
-        pip_cmd = "venv\\Scripts\\pip"
-    else:
-        pip_cmd = "venv/bin/pip"
-    if not run_command([pip_cmd, "install", "--upgrade", "pip"], "Upgrading pip"):
+    pip_cmd = [str(get_venv_python(venv_path)), "-m", "pip"]
+    if not run_command(pip_cmd + ["install", "--upgrade", "pip"], "Upgrading pip"):
         print("⚠️  Failed to upgrade pip, continuing...")
-    if not run_command([pip_cmd, "install", "-r", "requirements.txt"], "Installing requirements"):
+    if not run_command(pip_cmd + ["install", "-r", "requirements.txt"], "Installing requirements"):
         print("❌ Failed to install requirements")
         sys.exit(1)
+    # Lets run_tests.py inside this venv skip reinstalling the same requirements
+    requirements_hash = hashlib.sha256(Path("requirements.txt").read_bytes()).hexdigest()
+    (venv_path / ".requirements_hash").write_text(requirements_hash)
     env_file = Path(".env")
     if not env_file.exists():
         env_example = Path("env.example")
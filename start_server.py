@@ -9,6 +9,8 @@ import uvicorn
 from pathlib import Path
 from dotenv import load_dotenv
 
+from dspy_prompt_fixer.claude_lm import get_configured_model
+
 
 def check_environment():
     """Check if environment is properly configured."""
@@ -51,10 +53,14 @@ def main():
     host = os.getenv("HOST", "0.0.0.0")
     port = int(os.getenv("PORT", "8000"))
     debug = os.getenv("DEBUG", "false").lower() == "true"
+    # Examples, the prompt cache and recompile state live in each process, so
+    # more than one worker is opt-in; auto-reload only works with a single process
+    workers = 1 if debug else int(os.getenv("WORKERS", "1"))
 
     print(f"📍 Server will start on: http://{host}:{port}")
     print(f"🔧 Debug mode: {debug}")
-    print(f"🧠 Model: {os.getenv('CLAUDE_MODEL', 'claude-3-opus-20240229')}")
+    print(f"👷 Workers: {workers}")
+    print(f"🧠 Model: {get_configured_model()}")
 
     if debug:
         print("⚠️  Warning: Debug mode is enabled. Do not use in production!")
@@ -68,6 +74,10 @@ def main():
             host=host,
             port=port,
             reload=debug,
+            workers=workers,
+            # "auto" uses uvloop and httptools when installed (not on Windows)
+            loop="auto",
+            http="auto",
             log_level="info" if not debug else "debug",
             access_log=True
         )
@@ -0,0 +1,59 @@
+"""
+Shared fixtures for the test suite.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from dspy_prompt_fixer.examples import (
+    get_all_examples,
+    PROGRAMMING_EXAMPLES,
+    SPEECH_ERROR_EXAMPLES,
+    TECHNICAL_CORRECTIONS
+)
+from dspy_prompt_fixer.fix_module import PromptFixer
+from dspy_prompt_fixer.main import app
+
+
+@pytest.fixture
+def restore_examples():
+    """Drop examples a test appended to the module-level lists."""
+    # add_example only appends, so truncating to the old lengths restores the lists
+    lengths = (len(PROGRAMMING_EXAMPLES), len(SPEECH_ERROR_EXAMPLES), len(TECHNICAL_CORRECTIONS))
+    yield
+    for examples, length in zip((PROGRAMMING_EXAMPLES, SPEECH_ERROR_EXAMPLES, TECHNICAL_CORRECTIONS), lengths):
+        del examples[length:]
+    get_all_examples.cache_clear()
+
+
+@pytest.fixture(scope="session")
+def all_examples():
+    """The built-in training examples, collected once per session."""
+    return get_all_examples()
+
+
+@pytest.fixture(scope="session")
+def example_ids_by_category():
+    """Ids of the built-in examples in each category's source list, collected once per session."""
+    return {
+        "programming": frozenset(id(example) for example in PROGRAMMING_EXAMPLES),
+        "speech": frozenset(id(example) for example in SPEECH_ERROR_EXAMPLES),
+        "technical": frozenset(id(example) for example in TECHNICAL_CORRECTIONS)
+    }
+
+
+@pytest.fixture(scope="session")
+def client():
+    """One test client for the whole session, without running the app lifespan."""
+    return TestClient(app)
+
+
+@pytest.fixture(scope="session")
+def fixer_opt():
+    """A PromptFixer with optimization enabled, for tests that only read it."""
+    return PromptFixer(use_optimization=True)
+
+
+@pytest.fixture(scope="session")
+def fixer_noopt():
+    """A PromptFixer with optimization disabled, for tests that only read it."""
+    return PromptFixer(use_optimization=False)
@@ -0,0 +1,133 @@
+"""
+Unit tests for prompt cache module.
+"""
+
+import pytest
+import numpy as np
+from unittest.mock import patch
+from dspy_prompt_fixer.cache import PromptCache, normalize_prompt
+
+
+def fake_embedder(texts):
+    """Embed texts as bag-of-letters vectors so similar strings score high."""
+    vectors = np.zeros((len(texts), 26), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for char in text:
+            if 'a' <= char <= 'z':
+                vectors[row, ord(char) - ord('a')] += 1
+    return vectors
+
+
+class TestPromptCache:
+    """Test cases for PromptCache class."""
+
+    def test_normalize_prompt(self):
+        """Test prompt normalization."""
+        assert normalize_prompt("  Frogs   in\tRuby ") == "frogs in ruby"
+
+    def test_exact_hit(self):
+        """Test exact-match lookups use the normalized prompt."""
+        cache = PromptCache()
+        cache.put("frogs in ruby", "procs in ruby")
+
+        assert cache.get("Frogs  in ruby") == "procs in ruby"
+        assert cache.get("rails and rels") is None
+
+    def test_lru_eviction(self):
+        """Test least recently used prompts are evicted first."""
+        cache = PromptCache(maxsize=2)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        cache.get("a")
+        cache.put("c", "C")
+
+        assert len(cache) == 2
+        assert cache.get("a") == "A"
+        assert cache.get("b") is None
+        assert cache.get("c") == "C"
+
+    def test_semantic_hit(self):
+        """Test near-duplicate prompts hit the semantic tier."""
+        cache = PromptCache(similarity_threshold=0.9, embedder=fake_embedder)
+        cache.put("frogs in ruby", "procs in ruby")
+
+        assert cache.get("frog in ruby") == "procs in ruby"
+        assert cache.get("docker containers") is None
+
+    def test_semantic_eviction(self):
+        """Test evicted prompts no longer match semantically."""
+        cache = PromptCache(maxsize=1, similarity_threshold=0.9, embedder=fake_embedder)
+        cache.put("frogs in ruby", "procs in ruby")
+        cache.put("docker containers", "docker containers")
+
+        assert cache.get("frog in ruby") is None
+
+    def test_clear(self):
+        """Test clearing the cache."""
+        cache = PromptCache(embedder=fake_embedder)
+        cache.put("frogs in ruby", "procs in ruby")
+        cache.clear()
+
+        assert len(cache) == 0
+        assert cache.get("frogs in ruby") is None
+
+    def test_save_and_load(self, tmp_path):
+        """Test persisting the cache to disk."""
+        path = str(tmp_path / "cache.pkl")
+        cache = PromptCache()
+        cache.put("frogs in ruby", "procs in ruby")
+        cache.save(path)
+
+        restored = PromptCache(similarity_threshold=0.9, embedder=fake_embedder)
+        restored.load(path)
+
+        assert restored.get("frogs in ruby") == "procs in ruby"
+        assert restored.get("frog in ruby") == "procs in ruby"
+
+    def test_load_keeps_expiry_times(self, tmp_path):
+        """Test persisted entries keep their expiry and expired ones are dropped."""
+        path = str(tmp_path / "cache.pkl")
+        cache = PromptCache(ttl=60)
+        with patch('dspy_prompt_fixer.cache.time.monotonic', return_value=1000.0):
+            cache.put("frogs in ruby", "procs in ruby")
+        with patch('dspy_prompt_fixer.cache.time.monotonic', return_value=1030.0):
+            cache.put("rails and rels", "rails and routes")
+
+        with patch('dspy_prompt_fixer.cache.time.monotonic', return_value=1040.0), \
+                patch('dspy_prompt_fixer.cache.time.time', return_value=5000.0):
+            cache.save(path)
+
+        # Restart 40 seconds later: only the newer entry has time left
+        restored = PromptCache(ttl=60)
+        with patch('dspy_prompt_fixer.cache.time.monotonic', return_value=10.0), \
+                patch('dspy_prompt_fixer.cache.time.time', return_value=5040.0):
+            restored.load(path)
+            assert len(restored) == 1
+            assert restored.get("rails and rels") == "rails and routes"
+
+        with patch('dspy_prompt_fixer.cache.time.monotonic', return_value=21.0):
+            assert restored.get("rails and rels") is None
+
+    def test_ttl_expiry(self):
+        """Test entries expire after their time-to-live."""
+        cache = PromptCache(ttl=60)
+        with patch('dspy_prompt_fixer.cache.time.monotonic', return_value=1000.0):
+            cache.put("frogs in ruby", "procs in ruby")
+
+        with patch('dspy_prompt_fixer.cache.time.monotonic', return_value=1059.0):
+            assert cache.get("frogs in ruby") == "procs in ruby"
+
+        with patch('dspy_prompt_fixer.cache.time.monotonic', return_value=1061.0):
+            assert cache.get("frogs in ruby") is None
+
+        assert len(cache) == 0
+
+    def test_stats(self):
+        """Test hits and misses are counted."""
+        cache = PromptCache()
+        cache.put("frogs in ruby", "procs in ruby")
+        cache.get("frogs in ruby")
+        cache.get("frogs in ruby")
+        cache.get("rails and rels")
+
+        assert cache.stats() == {"size": 1, "hits": 2, "misses": 1, "hit_rate": 2 / 3}
@@ -4,8 +4,17 @@ Unit tests for Claude LanguageModel wrapper.
 
 import pytest
 import os
-from unittest.mock import Mock, patch, MagicMock
-from dspy_prompt_fixer.claude_lm import ClaudeLM
+import anthropic
+import httpx
+from unittest.mock import Mock, patch, MagicMock, AsyncMock
+from dspy_prompt_fixer.claude_lm import (
+    ClaudeLM,
+    DEFAULT_MODEL,
+    get_configured_model,
+    reset_clients,
+    _get_client,
+    _get_async_client
+)
 
 
 class TestClaudeLM:
@@ -15,6 +24,8 @@ class TestClaudeLM:
         """Set up test fixtures."""
         self.mock_api_key = "test-api-key-123"
         self.mock_model = "claude-3-opus-20240229"
+        _get_client.cache_clear()
+        _get_async_client.cache_clear()
 
     def test_init_with_api_key(self):
         """Test initialization with explicit API key."""
@@ -24,7 +35,8 @@ class TestClaudeLM:
             assert lm.api_key == self.mock_api_key
             assert lm.model == self.mock_model
             assert lm.client is not None
-            mock_anthropic.assert_called_once_with(api_key=self.mock_api_key)
+            mock_anthropic.assert_called_once()
+            assert mock_anthropic.call_args[1]['api_key'] == self.mock_api_key
 
     def test_init_with_env_var(self):
         """Test initialization with API key from environment variable."""
@@ -34,7 +46,28 @@ class TestClaudeLM:
 
                 assert lm.api_key == self.mock_api_key
                 assert lm.model == self.mock_model
-                mock_anthropic.assert_called_once_with(api_key=self.mock_api_key)
+                mock_anthropic.assert_called_once()
+                assert mock_anthropic.call_args[1]['api_key'] == self.mock_api_key
+
+    def test_client_reused_across_instances(self):
+        """Test that instances with the same API key share one client."""
+        with patch('anthropic.Anthropic') as mock_anthropic:
+            first = ClaudeLM(api_key=self.mock_api_key)
+            second = ClaudeLM(api_key=self.mock_api_key)
+
+            assert first.client is second.client
+            mock_anthropic.assert_called_once()
+
+    def test_reset_clients(self):
+        """Test instances built after a reset get new clients."""
+        with patch('anthropic.Anthropic', side_effect=lambda **kwargs: Mock()), \
+                patch('anthropic.AsyncAnthropic', side_effect=lambda **kwargs: Mock()):
+            first = ClaudeLM(api_key=self.mock_api_key)
+            reset_clients()
+            second = ClaudeLM(api_key=self.mock_api_key)
+
+            assert first.client is not second.client
+            assert first.async_client is not second.async_client
 
     def test_init_without_api_key(self):
         """Test initialization fails without API key."""
@@ -92,6 +125,106 @@ class TestClaudeLM:
             assert call_args[1]['temperature'] == 0.3
             assert call_args[1]['max_tokens'] == 256
 
+    def test_call_with_system_message(self):
+        """Test system messages are sent as a cacheable system block."""
+        mock_response = Mock()
+        mock_content = Mock()
+        mock_content.text = "Test response"
+        mock_response.content = [mock_content]
+
+        with patch('anthropic.Anthropic') as mock_anthropic:
+            mock_client = Mock()
+            mock_client.messages.create.return_value = mock_response
+            mock_anthropic.return_value = mock_client
+
+            lm = ClaudeLM(api_key=self.mock_api_key)
+            lm(messages=[
+                {"role": "system", "content": "Instructions"},
+                {"role": "user", "content": "Test prompt"}
+            ])
+
+            call_args = mock_client.messages.create.call_args
+            assert call_args[1]['system'] == [{
+                "type": "text",
+                "text": "Instructions",
+                "cache_control": {"type": "ephemeral"}
+            }]
+            assert call_args[1]['messages'] == [{"role": "user", "content": "Test prompt"}]
+
+    def test_call_marks_demo_prefix(self):
+        """Test the last demo turn carries a cache breakpoint."""
+        mock_response = Mock()
+        mock_content = Mock()
+        mock_content.text = "Test response"
+        mock_response.content = [mock_content]
+
+        messages = [
+            {"role": "system", "content": "Instructions"},
+            {"role": "user", "content": "frogs in ruby"},
+            {"role": "assistant", "content": "procs in ruby"},
+            {"role": "user", "content": "Test prompt"}
+        ]
+
+        with patch('anthropic.Anthropic') as mock_anthropic:
+            mock_client = Mock()
+            mock_client.messages.create.return_value = mock_response
+            mock_anthropic.return_value = mock_client
+
+            lm = ClaudeLM(api_key=self.mock_api_key)
+            lm(messages=messages)
+
+            sent = mock_client.messages.create.call_args[1]['messages']
+            assert sent[0] == {"role": "user", "content": "frogs in ruby"}
+            assert sent[1] == {"role": "assistant", "content": [{
+                "type": "text",
+                "text": "procs in ruby",
+                "cache_control": {"type": "ephemeral"}
+            }]}
+            assert sent[2] == {"role": "user", "content": "Test prompt"}
+            # The caller's messages are left untouched
+            assert messages[2]["content"] == "procs in ruby"
+
+    def test_stream_first_line(self):
+        """Test streaming stops once the first line is complete."""
+        chunks = ["\nprocs ", "in ruby\nThis fixes", " the misheard word", "never read"]
+        consumed = []
+
+        def text_stream():
+            for chunk in chunks:
+                consumed.append(chunk)
+                yield chunk
+
+        with patch('anthropic.Anthropic') as mock_anthropic:
+            mock_client = MagicMock()
+            stream = mock_client.messages.stream.return_value.__enter__.return_value
+            stream.text_stream = text_stream()
+            mock_anthropic.return_value = mock_client
+
+            lm = ClaudeLM(api_key=self.mock_api_key)
+            result = lm.stream_first_line("Test prompt")
+
+            assert result == "procs in ruby"
+            assert consumed == chunks[:2]
+            assert mock_client.messages.stream.call_args[1]['stop_sequences'] == ["\n\n"]
+
+    def test_stream_first_line_falls_back(self):
+        """Test a failed stream falls back to a regular call."""
+        mock_response = Mock()
+        mock_content = Mock()
+        mock_content.text = "procs in ruby"
+        mock_response.content = [mock_content]
+
+        with patch('anthropic.Anthropic') as mock_anthropic:
+            mock_client = Mock()
+            mock_client.messages.stream.side_effect = Exception("Stream error")
+            mock_client.messages.create.return_value = mock_response
+            mock_anthropic.return_value = mock_client
+
+            lm = ClaudeLM(api_key=self.mock_api_key)
+
+            assert lm.stream_first_line("Test prompt") == "procs in ruby"
+            assert 'stop_sequences' not in mock_client.messages.create.call_args[1]
+
     def test_call_empty_response(self):
         """Test handling of empty response."""
         mock_response = Mock()
@@ -107,6 +240,94 @@ class TestClaudeLM:
 
             assert result == ""
 
+    def _status_error(self, status_code, retry_after=None):
+        """Build the error the SDK raises for an HTTP error status (call before patching the client)."""
+        headers = {"retry-after": retry_after} if retry_after else {}
+        response = httpx.Response(status_code, headers=headers,
+                                  request=httpx.Request("POST", "https://api.anthropic.com/v1/messages"))
+        return anthropic.Anthropic(api_key=self.mock_api_key)._make_status_error(
+            "request failed", body=None, response=response)
+
+    def _rate_limit_error(self, retry_after=None):
+        """Build a RateLimitError like the SDK raises for HTTP 429."""
+        headers = {"retry-after": retry_after} if retry_after else {}
+        response = httpx.Response(429, headers=headers,
+                                  request=httpx.Request("POST", "https://api.anthropic.com/v1/messages"))
+        return anthropic.RateLimitError("rate limited", response=response, body=None)
+
+    @patch('dspy_prompt_fixer.claude_lm.time.sleep')
+    def test_call_retries_transient_errors(self, mock_sleep):
+        """Test rate-limited calls are retried, honoring Retry-After."""
+        mock_response = Mock()
+        mock_content = Mock()
+        mock_content.text = "Test response"
+        mock_response.content = [mock_content]
+
+        with patch('anthropic.Anthropic') as mock_anthropic:
+            mock_client = Mock()
+            mock_client.messages.create.side_effect = [self._rate_limit_error("2"), mock_response]
+            mock_anthropic.return_value = mock_client
+
+            lm = ClaudeLM(api_key=self.mock_api_key)
+            result = lm("Test prompt")
+
+            assert result == "Test response"
+            assert mock_client.messages.create.call_count == 2
+            mock_sleep.assert_called_once_with(2.0)
+
+    @pytest.mark.parametrize("status_code", [408, 409, 500, 529])
+    @patch('dspy_prompt_fixer.claude_lm.time.sleep')
+    def test_call_retries_server_errors(self, mock_sleep, status_code):
+        """Test overloaded, server and other transient status errors are retried."""
+        mock_response = Mock()
+        mock_response.content = [Mock(text="Test response")]
+        error = self._status_error(status_code)
+
+        with patch('anthropic.Anthropic') as mock_anthropic:
+            mock_client = Mock()
+            mock_client.messages.create.side_effect = [error, mock_response]
+            mock_anthropic.return_value = mock_client
+
+            lm = ClaudeLM(api_key=self.mock_api_key)
+
+            assert lm("Test prompt") == "Test response"
+            assert mock_client.messages.create.call_count == 2
+
+    @patch('dspy_prompt_fixer.claude_lm.time.sleep')
+    def test_call_does_not_retry_client_errors(self, mock_sleep):
+        """Test a bad request fails without retrying."""
+        error = self._status_error(400)
+
+        with patch('anthropic.Anthropic') as mock_anthropic:
+            mock_client = Mock()
+            mock_client.messages.create.side_effect = error
+            mock_anthropic.return_value = mock_client
+
+            lm = ClaudeLM(api_key=self.mock_api_key)
+
+            with pytest.raises(RuntimeError, match="Error calling Claude API"):
+                lm("Test prompt")
+
+            assert mock_client.messages.create.call_count == 1
+            mock_sleep.assert_not_called()
+
+    @patch('dspy_prompt_fixer.claude_lm.time.sleep')
+    def test_call_retries_exhausted(self, mock_sleep):
+        """Test the error surfaces once retries are used up."""
+        with patch.dict(os.environ, {'DSPY_MAX_RETRIES': '2'}):
+            with patch('anthropic.Anthropic') as mock_anthropic:
+                mock_client = Mock()
+                mock_client.messages.create.side_effect = self._rate_limit_error()
+                mock_anthropic.return_value = mock_client
+
+                lm = ClaudeLM(api_key=self.mock_api_key)
+
+                with pytest.raises(RuntimeError, match="Error calling Claude API"):
+                    lm("Test prompt")
+
+                assert mock_client.messages.create.call_count == 3
+                assert mock_sleep.call_count == 2
+
     def test_call_api_error(self):
         """Test handling of API errors."""
         with patch('anthropic.Anthropic') as mock_anthropic:
@@ -119,6 +340,95 @@ class TestClaudeLM:
             with pytest.raises(RuntimeError, match="Error calling Claude API"):
                 lm("Test prompt")
 
+    @pytest.mark.asyncio
+    async def test_astream(self):
+        """Test streaming yields text deltas with the given stop sequences."""
+        async def text_stream():
+            for chunk in ["procs ", "in ruby"]:
+                yield chunk
+
+        with patch('anthropic.AsyncAnthropic') as mock_async_anthropic:
+            mock_client = MagicMock()
+            stream = mock_client.messages.stream.return_value.__aenter__.return_value
+            stream.text_stream = text_stream()
+            mock_async_anthropic.return_value = mock_client
+
+            lm = ClaudeLM(api_key=self.mock_api_key)
+            chunks = [text async for text in lm.astream("Test prompt", stop_sequences=["\n\n"])]
+
+            assert chunks == ["procs ", "in ruby"]
+            assert mock_client.messages.stream.call_args[1]['stop_sequences'] == ["\n\n"]
+
+    @pytest.mark.asyncio
+    async def test_acall_success(self):
+        """Test successful async API call."""
+        mock_response = Mock()
+        mock_content = Mock()
+        mock_content.text = "Test response"
+        mock_response.content = [mock_content]
+
+        with patch('anthropic.AsyncAnthropic') as mock_async_anthropic:
+            mock_client = Mock()
+            mock_client.messages.create = AsyncMock(return_value=mock_response)
+            mock_async_anthropic.return_value = mock_client
+
+            lm = ClaudeLM(api_key=self.mock_api_key)
+            result = await lm.acall("Test prompt", max_tokens=256)
+
+            assert result == ["Test response"]
+            call_args = mock_client.messages.create.call_args
+            assert call_args[1]['max_tokens'] == 256
+
+    @pytest.mark.asyncio
+    async def test_acall_with_dspy_predict(self):
+        """Test DSPy's async Predict path parses ClaudeLM's output."""
+        import dspy
+        from dspy_prompt_fixer.fix_module import FixProgrammingPrompt
+
+        mock_response = Mock()
+        mock_response.content = [Mock(text="[[ ## corrected_prompt ## ]]\nprocs in ruby\n\n[[ ## completed ## ]]")]
+
+        with patch('anthropic.AsyncAnthropic') as mock_async_anthropic:
+            mock_client = Mock()
+            mock_client.messages.create = AsyncMock(return_value=mock_response)
+            mock_async_anthropic.return_value = mock_client
+
+            lm = ClaudeLM(api_key=self.mock_api_key)
+            result = await dspy.Predict(FixProgrammingPrompt).acall(raw_prompt="prox in rubi", lm=lm)
+
+            assert result.corrected_prompt == "procs in ruby"
+
+    @pytest.mark.asyncio
+    async def test_acall_api_error(self):
+        """Test handling of API errors in async calls."""
+        with patch('anthropic.AsyncAnthropic') as mock_async_anthropic:
+            mock_client = Mock()
+            mock_client.messages.create = AsyncMock(side_effect=Exception("API Error"))
+            mock_async_anthropic.return_value = mock_client
+
+            lm = ClaudeLM(api_key=self.mock_api_key)
+
+            with pytest.raises(RuntimeError, match="Error calling Claude API"):
+                await lm.acall("Test prompt")
+
+    def test_default_model(self):
+        """Test the default model is the fast Haiku model."""
+        with patch('anthropic.Anthropic'):
+            lm = ClaudeLM(api_key=self.mock_api_key)
+
+            assert lm.model == DEFAULT_MODEL
+
+    def test_configured_model_from_env(self):
+        """Test DSPY_CLAUDE_MODEL takes precedence over CLAUDE_MODEL."""
+        with patch.dict(os.environ, {'CLAUDE_MODEL': 'legacy-model'}, clear=True):
+            assert get_configured_model() == 'legacy-model'
+
+        with patch.dict(os.environ, {'DSPY_CLAUDE_MODEL': 'new-model', 'CLAUDE_MODEL': 'legacy-model'}, clear=True):
+            assert get_configured_model() == 'new-model'
+
+        with patch.dict(os.environ, {}, clear=True):
+            assert get_configured_model() == DEFAULT_MODEL
+
     def test_get_config(self):
         """Test getting configuration."""
         with patch('anthropic.Anthropic'):
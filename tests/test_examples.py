@@ -2,12 +2,17 @@
 Unit tests for examples module.
 """
 
+import sys
 import pytest
 from dspy_prompt_fixer.examples import (
     get_all_examples,
     get_examples_by_category,
     add_example,
+    add_examples,
     get_example_count,
+    get_example_dicts,
+    get_training_examples,
+    lookup_known_correction,
     PROGRAMMING_EXAMPLES,
     SPEECH_ERROR_EXAMPLES,
     TECHNICAL_CORRECTIONS
@@ -17,76 +22,41 @@ from dspy_prompt_fixer.examples import (
 class TestExamples:
     """Test cases for examples module."""
 
-    def setup_method(self):
-        """Set up test fixtures."""
-        # Store original examples to restore after tests
-        self.original_programming = PROGRAMMING_EXAMPLES.copy()
-        self.original_speech = SPEECH_ERROR_EXAMPLES.copy()
-        self.original_technical = TECHNICAL_CORRECTIONS.copy()
-
-    def teardown_method(self):
-        """Clean up after tests."""
-        # Restore original examples
-        PROGRAMMING_EXAMPLES.clear()
-        PROGRAMMING_EXAMPLES.extend(self.original_programming)
-        SPEECH_ERROR_EXAMPLES.clear()
-        SPEECH_ERROR_EXAMPLES.extend(self.original_speech)
-        TECHNICAL_CORRECTIONS.clear()
-        TECHNICAL_CORRECTIONS.extend(self.original_technical)
-
-    def test_get_all_examples(self):
+    def test_get_all_examples(self, all_examples):
         """Test getting all examples."""
-        examples = get_all_examples()
-
-        assert isinstance(examples, list)
-        assert len(examples) > 0
+        assert isinstance(all_examples, tuple)
+        assert len(all_examples) > 0
 
         # Check that all examples have required keys
-        for example in examples:
+        for example in all_examples:
             assert 'raw_prompt' in example
             assert 'corrected_prompt' in example
             assert isinstance(example['raw_prompt'], str)
             assert isinstance(example['corrected_prompt'], str)
 
-    def test_get_examples_by_category_programming(self):
-        """Test getting programming examples."""
-        examples = get_examples_by_category('programming')
-
-        assert isinstance(examples, list)
-        assert len(examples) > 0
-
-        # Check that these are programming examples
-        for example in examples:
-            assert example in PROGRAMMING_EXAMPLES
-
-    def test_get_examples_by_category_speech(self):
-        """Test getting speech error examples."""
-        examples = get_examples_by_category('speech')
+    @pytest.mark.parametrize("category", ["programming", "speech", "technical"])
+    def test_get_examples_by_category(self, category, example_ids_by_category):
+        """Test getting the examples of a single category."""
+        examples = get_examples_by_category(category)
 
         assert isinstance(examples, list)
         assert len(examples) > 0
 
-        # Check that these are speech examples
-        for example in examples:
-            assert example in SPEECH_ERROR_EXAMPLES
-
-    def test_get_examples_by_category_technical(self):
-        """Test getting technical correction examples."""
-        examples = get_examples_by_category('technical')
+        # Check that these are the examples from that category's list, by identity
+        target_ids = example_ids_by_category[category]
+        assert len(examples) == len(target_ids)
+        assert all(id(example) in target_ids for example in examples)
 
-        assert isinstance(examples, list)
-        assert len(examples) > 0
-
-        # Check that these are technical examples
-        for example in examples:
-            assert example in TECHNICAL_CORRECTIONS
-
-    def test_get_examples_by_category_all(self):
+    def test_get_examples_by_category_all(self, all_examples):
         """Test getting all examples via category."""
         examples = get_examples_by_category('all')
-        all_examples = get_all_examples()
 
-        assert examples == all_examples
+        assert isinstance(examples, list)
+        assert examples == list(all_examples)
+
+        # Callers get their own list, not the cached snapshot or a category list
+        examples.append(examples[0])
+        assert len(get_all_examples()) == len(all_examples)
 
     def test_get_examples_by_category_invalid(self):
         """Test getting examples with invalid category."""
@@ -94,49 +64,75 @@ class TestExamples:
 
         assert examples == []
 
-    def test_add_example_programming(self):
-        """Test adding a programming example."""
-        initial_count = len(PROGRAMMING_EXAMPLES)
+    @pytest.mark.parametrize("category,target", [
+        ("programming", PROGRAMMING_EXAMPLES),
+        ("speech", SPEECH_ERROR_EXAMPLES),
+        ("technical", TECHNICAL_CORRECTIONS)
+    ])
+    def test_add_example(self, category, target, restore_examples):
+        """Test adding an example to each category."""
+        initial_count = len(target)
 
         add_example(
             raw_prompt="test raw prompt",
             corrected_prompt="test corrected prompt",
-            category="programming"
+            category=category
         )
 
-        assert len(PROGRAMMING_EXAMPLES) == initial_count + 1
-        assert PROGRAMMING_EXAMPLES[-1]['raw_prompt'] == "test raw prompt"
-        assert PROGRAMMING_EXAMPLES[-1]['corrected_prompt'] == "test corrected prompt"
+        assert len(target) == initial_count + 1
+        assert target[-1]['raw_prompt'] == "test raw prompt"
+        assert target[-1]['corrected_prompt'] == "test corrected prompt"
 
-    def test_add_example_speech(self):
-        """Test adding a speech example."""
-        initial_count = len(SPEECH_ERROR_EXAMPLES)
+    def test_get_all_examples_cached(self, restore_examples):
+        """Test all examples are cached until an example is added."""
+        examples = get_all_examples()
 
-        add_example(
-            raw_prompt="test raw prompt",
-            corrected_prompt="test corrected prompt",
-            category="speech"
-        )
+        assert get_all_examples() is examples
 
-        assert len(SPEECH_ERROR_EXAMPLES) == initial_count + 1
-        assert SPEECH_ERROR_EXAMPLES[-1]['raw_prompt'] == "test raw prompt"
-        assert SPEECH_ERROR_EXAMPLES[-1]['corrected_prompt'] == "test corrected prompt"
+        add_example(raw_prompt="test raw prompt", corrected_prompt="test corrected prompt")
+        updated = get_all_examples()
 
-    def test_add_example_technical(self):
-        """Test adding a technical example."""
-        initial_count = len(TECHNICAL_CORRECTIONS)
+        assert updated is not examples
+        assert len(updated) == len(examples) + 1
 
-        add_example(
-            raw_prompt="test raw prompt",
-            corrected_prompt="test corrected prompt",
-            category="technical"
-        )
+    def test_add_example_interns_strings(self, restore_examples):
+        """Test added examples share interned strings and mark their input."""
+        raw_prompt = "".join(["test raw ", "prompt"])
+
+        add_example(raw_prompt=raw_prompt, corrected_prompt="test corrected prompt")
+
+        example = PROGRAMMING_EXAMPLES[-1]
+        assert example['raw_prompt'] is sys.intern("test raw prompt")
+        assert set(example.inputs().keys()) == {"raw_prompt"}
+
+    def test_add_examples(self, restore_examples):
+        """Test adding several examples at once."""
+        programming_count = len(PROGRAMMING_EXAMPLES)
+        speech_count = len(SPEECH_ERROR_EXAMPLES)
 
-        assert len(TECHNICAL_CORRECTIONS) == initial_count + 1
-        assert TECHNICAL_CORRECTIONS[-1]['raw_prompt'] == "test raw prompt"
-        assert TECHNICAL_CORRECTIONS[-1]['corrected_prompt'] == "test corrected prompt"
+        added = add_examples([
+            {"raw_prompt": "frogs in go", "corrected_prompt": "procs in go"},
+            {"raw_prompt": "pie thon", "corrected_prompt": "python", "category": "speech"}
+        ])
 
-    def test_add_example_invalid_category(self):
+        assert added == 2
+        assert len(PROGRAMMING_EXAMPLES) == programming_count + 1
+        assert len(SPEECH_ERROR_EXAMPLES) == speech_count + 1
+        assert len(get_all_examples()) == programming_count + speech_count + len(TECHNICAL_CORRECTIONS) + 2
+
+    def test_add_examples_invalid_category_adds_nothing(self, restore_examples):
+        """Test an invalid entry leaves the training set unchanged."""
+        total = len(get_all_examples())
+
+        with pytest.raises(ValueError, match="Unknown category: invalid"):
+            add_examples([
+                {"raw_prompt": "frogs in go", "corrected_prompt": "procs in go"},
+                {"raw_prompt": "a", "corrected_prompt": "b", "category": "invalid"}
+            ])
+
+        assert len(get_all_examples()) == total
+
+    def test_add_example_invalid_category(self, restore_examples):
         """Test adding example with invalid category."""
         with pytest.raises(ValueError, match="Unknown category: invalid"):
             add_example(
@@ -145,7 +141,44 @@ class TestExamples:
                 category="invalid"
             )
 
-    def test_get_example_count(self):
+    def test_get_training_examples(self, restore_examples):
+        """Test training examples skip identity and duplicate pairs."""
+        add_example(raw_prompt="frogs in ruby", corrected_prompt="procs in ruby", category="speech")
+
+        examples = get_training_examples()
+        raw_prompts = [ex['raw_prompt'] for ex in examples]
+
+        assert len(examples) > 0
+        assert all(ex['raw_prompt'] != ex['corrected_prompt'] for ex in examples)
+        assert raw_prompts.count("frogs in ruby") == 1
+
+    def test_lookup_known_correction(self, restore_examples):
+        """Test looking up corrections for known example prompts."""
+        assert lookup_known_correction("  Frogs in RUBY ") == "procs in ruby"
+        assert lookup_known_correction("unknown prompt") is None
+
+        add_example(raw_prompt="lamb does in python", corrected_prompt="lambdas in python")
+
+        assert lookup_known_correction("lamb does in python") == "lambdas in python"
+
+    def test_get_example_dicts_reused_until_added(self, restore_examples):
+        """Test serialized examples are reused until an example is added."""
+        first = get_example_dicts("programming")
+        assert get_example_dicts("programming") is first
+        assert first[0] == {
+            "raw_prompt": PROGRAMMING_EXAMPLES[0].raw_prompt,
+            "corrected_prompt": PROGRAMMING_EXAMPLES[0].corrected_prompt
+        }
+
+        add_example("frogs in go", "procs in go", "programming")
+
+        refreshed = get_example_dicts("programming")
+        assert refreshed is not first
+        assert refreshed[-1] == {"raw_prompt": "frogs in go", "corrected_prompt": "procs in go"}
+        assert len(get_example_dicts("all")) == len(get_all_examples())
+        assert get_example_dicts("invalid") == []
+
+    def test_get_example_count(self, all_examples):
         """Test getting example counts."""
         counts = get_example_count()
 
@@ -159,16 +192,14 @@ class TestExamples:
         assert counts['programming'] == len(PROGRAMMING_EXAMPLES)
         assert counts['speech'] == len(SPEECH_ERROR_EXAMPLES)
         assert counts['technical'] == len(TECHNICAL_CORRECTIONS)
-        assert counts['total'] == len(get_all_examples())
+        assert counts['total'] == len(all_examples)
 
         # Check that total equals sum of categories
         expected_total = counts['programming'] + counts['speech'] + counts['technical']
         assert counts['total'] == expected_total
 
-    def test_example_structure(self):
+    def test_example_structure(self, all_examples):
         """Test that all examples have correct structure."""
-        all_examples = get_all_examples()
-
         for example in all_examples:
             # Check required fields
             assert 'raw_prompt' in example
@@ -182,10 +213,15 @@ class TestExamples:
             assert example['raw_prompt'].strip() != ""
             assert example['corrected_prompt'].strip() != ""
 
-    def test_example_uniqueness(self):
+    def test_example_uniqueness(self, all_examples):
         """Test that examples are unique."""
-        all_examples = get_all_examples()
-        raw_prompts = [ex['raw_prompt'] for ex in all_examples]
+        seen = set()
+        duplicate = None
+        for example in all_examples:
+            raw_prompt = example['raw_prompt']
+            if raw_prompt in seen:
+                duplicate = raw_prompt
+                break
+            seen.add(raw_prompt)
 
-        # Check for duplicates
-        assert len(raw_prompts) == len(set(raw_prompts))
+        assert duplicate is None, f"duplicate raw_prompt: {duplicate!r}"
@@ -3,8 +3,26 @@ Unit tests for DSPy fix module.
 """
 
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+import dspy
+from unittest.mock import Mock, patch, MagicMock, AsyncMock
 from dspy_prompt_fixer.fix_module import PromptFixer, FixProgrammingPrompt, fix_prompt_quick
+from dspy_prompt_fixer.claude_lm import ClaudeLM
+
+
+@pytest.fixture
+def mock_predict(monkeypatch):
+    """Replace dspy.Predict in the fix module with a mock."""
+    predict = MagicMock()
+    monkeypatch.setattr('dspy_prompt_fixer.fix_module.dspy.Predict', predict)
+    return predict
+
+
+@pytest.fixture
+def mock_prompt_fixer_class(monkeypatch):
+    """Replace the PromptFixer class used by fix_prompt_quick with a mock."""
+    prompt_fixer_class = MagicMock()
+    monkeypatch.setattr('dspy_prompt_fixer.fix_module.PromptFixer', prompt_fixer_class)
+    return prompt_fixer_class
 
 
 class TestFixProgrammingPrompt:
@@ -40,98 +58,186 @@ class TestFixProgrammingPrompt:
 class TestPromptFixer:
     """Test cases for PromptFixer class."""
 
+    # Mock scaffolding built once; tests override only the parts that vary
+    _prediction = Mock(corrected_prompt="corrected prompt")
+    _compiled_module = Mock()
+    _optimizer = Mock()
+    _optimizer.compile.return_value = _compiled_module
+
     def setup_method(self):
         """Set up test fixtures."""
+        self._optimizer.reset_mock()
         self.test_examples = [
             {"raw_prompt": "frogs in ruby", "corrected_prompt": "procs in ruby"},
             {"raw_prompt": "rails and rels", "corrected_prompt": "rails and routes"},
         ]
 
-    def test_init_with_optimization(self):
+    def test_init_with_optimization(self, fixer_opt):
         """Test initialization with optimization enabled."""
-        fixer = PromptFixer(use_optimization=True)
-
-        assert fixer.use_optimization is True
-        assert fixer.fix_prompt_module is not None
-        assert fixer.compiled_module is None
+        assert fixer_opt.use_optimization is True
+        assert fixer_opt.fix_prompt_module is not None
+        assert fixer_opt.compiled_module is None
 
-    def test_init_without_optimization(self):
+    def test_init_without_optimization(self, fixer_noopt):
         """Test initialization with optimization disabled."""
-        fixer = PromptFixer(use_optimization=False)
-
-        assert fixer.use_optimization is False
-        assert fixer.fix_prompt_module is not None
-        assert fixer.compiled_module is None
+        assert fixer_noopt.use_optimization is False
+        assert fixer_noopt.fix_prompt_module is not None
+        assert fixer_noopt.compiled_module is None
 
-    @patch('dspy.teleprompt.MIPROv2')
-    @patch('dspy.evaluate.EM')
+    @patch('dspy_prompt_fixer.fix_module.MIPROv2')
+    @patch('dspy_prompt_fixer.fix_module.EM')
     def test_compile_with_examples_success(self, mock_exact_match, mock_mipro):
         """Test successful compilation with examples."""
-        mock_metric = Mock()
-        mock_exact_match.return_value = mock_metric
+        mock_mipro.return_value = self._optimizer
+
+        fixer = PromptFixer(use_optimization=True)
+        fixer.compile_with_examples(self.test_examples)
+
+        # Check that MIPRO was called correctly
+        mock_mipro.assert_called_once_with(metric=mock_exact_match, num_threads=8)
+        self._optimizer.compile.assert_called_once()
+
+        assert fixer.compiled_module == self._compiled_module
+
+    @patch('dspy_prompt_fixer.fix_module.MIPROv2')
+    @patch('dspy_prompt_fixer.fix_module.EM')
+    def test_compile_with_examples_marks_inputs(self, mock_exact_match, mock_mipro):
+        """Test examples reach MIPRO with raw_prompt as the input field."""
+        prepared = dspy.Example(raw_prompt="frogs in ruby", corrected_prompt="procs in ruby").with_inputs("raw_prompt")
+        bare = dspy.Example(raw_prompt="rails and rels", corrected_prompt="rails and routes")
+
+        fixer = PromptFixer(use_optimization=True)
+        fixer.compile_with_examples([prepared, bare, self.test_examples[0]])
+
+        trainset = mock_mipro.return_value.compile.call_args[1]['trainset']
+        assert trainset[0] is prepared
+        assert all(set(example.inputs().keys()) == {"raw_prompt"} for example in trainset)
+
+    @patch('dspy_prompt_fixer.fix_module.MIPROv2')
+    @patch('dspy_prompt_fixer.fix_module.EM')
+    def test_compile_with_examples_prepared_fast_path(self, mock_exact_match, mock_mipro):
+        """Test prepared Examples are passed through without conversion."""
+        examples = [
+            dspy.Example(raw_prompt="frogs in ruby", corrected_prompt="procs in ruby").with_inputs("raw_prompt")
+        ]
+
+        fixer = PromptFixer(use_optimization=True)
+        with patch.object(PromptFixer, '_as_training_example') as mock_convert:
+            fixer.compile_with_examples(examples)
+
+        mock_convert.assert_not_called()
+        assert mock_mipro.return_value.compile.call_args[1]['trainset'] == examples
+
+    @patch.dict('os.environ', {'DSPY_MIPRO_THREADS': '16'})
+    @patch('dspy_prompt_fixer.fix_module.MIPROv2')
+    @patch('dspy_prompt_fixer.fix_module.EM')
+    def test_compile_with_examples_threads_from_env(self, mock_exact_match, mock_mipro):
+        """Test MIPRO evaluation threads are configurable."""
+        fixer = PromptFixer(use_optimization=True)
+        fixer.compile_with_examples(self.test_examples)
+
+        assert mock_mipro.call_args[1]['num_threads'] == 16
+
+    @patch('dspy_prompt_fixer.fix_module.MIPROv2')
+    @patch('dspy_prompt_fixer.fix_module.EM')
+    def test_compile_with_examples_compile_lm(self, mock_exact_match, mock_mipro):
+        """Test compilation runs against the dedicated compile LM."""
+        compile_lm = Mock()
+        seen_lms = []
 
         mock_optimizer = Mock()
+        mock_optimizer.compile.side_effect = lambda *args, **kwargs: seen_lms.append(dspy.settings.lm)
         mock_mipro.return_value = mock_optimizer
 
-        mock_compiled = Mock()
-        mock_optimizer.compile.return_value = mock_compiled
-
         fixer = PromptFixer(use_optimization=True)
+        fixer.compile_with_examples(self.test_examples, compile_lm=compile_lm)
+
+        assert seen_lms == [compile_lm]
+        assert dspy.settings.lm is not compile_lm
+
+    @patch('dspy_prompt_fixer.fix_module.MIPROv2')
+    @patch('dspy_prompt_fixer.fix_module.EM')
+    def test_compile_with_examples_reuses_saved_module(self, mock_exact_match, mock_mipro, tmp_path):
+        """Test a module compiled from the same examples is loaded, not recompiled."""
+        compiled = dspy.Predict(FixProgrammingPrompt)
+        compiled.demos = [dspy.Example(raw_prompt="frogs in ruby", corrected_prompt="procs in ruby")]
+        mock_mipro.return_value.compile.return_value = compiled
+
+        PromptFixer(use_optimization=True, compiled_dir=str(tmp_path)).compile_with_examples(self.test_examples)
+        assert len(list(tmp_path.glob("*.json"))) == 1
+
+        fixer = PromptFixer(use_optimization=True, compiled_dir=str(tmp_path))
         fixer.compile_with_examples(self.test_examples)
 
-        # Check that MIPRO was called correctly
-        mock_exact_match.assert_called_once()
-        mock_mipro.assert_called_once_with(metric=mock_metric)
-        mock_optimizer.compile.assert_called_once()
+        mock_mipro.return_value.compile.assert_called_once()
+        assert fixer.compiled_module.demos[0]["corrected_prompt"] == "procs in ruby"
+
+        # A different example set is compiled and saved separately
+        fixer.compile_with_examples(self.test_examples[:1])
+        assert mock_mipro.return_value.compile.call_count == 2
+        assert len(list(tmp_path.glob("*.json"))) == 2
+
+    @patch('dspy_prompt_fixer.fix_module.MIPROv2')
+    @patch('dspy_prompt_fixer.fix_module.EM')
+    def test_compile_with_examples_saves_per_model(self, mock_exact_match, mock_mipro, tmp_path):
+        """Test a module compiled for one model is not reused for another."""
+        mock_mipro.return_value.compile.return_value = dspy.Predict(FixProgrammingPrompt)
 
-        assert fixer.compiled_module == mock_compiled
+        for model in ["claude-a", "claude-b", "claude-a"]:
+            fixer = PromptFixer(use_optimization=True, lm=Mock(model=model), compiled_dir=str(tmp_path))
+            fixer.compile_with_examples(self.test_examples)
 
-    @patch('dspy.teleprompt.MIPROv2')
-    @patch('dspy.evaluate.EM')
-    def test_compile_with_examples_import_error(self, mock_exact_match, mock_mipro):
-        """Test compilation with import error."""
-        mock_mipro.side_effect = ImportError("Module not found")
+        assert mock_mipro.return_value.compile.call_count == 2
+        assert len(list(tmp_path.glob("*.json"))) == 2
 
+    @patch('dspy_prompt_fixer.fix_module._HAS_MIPRO', False)
+    @patch('dspy_prompt_fixer.fix_module.MIPROv2')
+    def test_compile_with_examples_import_error(self, mock_mipro):
+        """Test compilation when optimization modules failed to import."""
         fixer = PromptFixer(use_optimization=True)
         fixer.compile_with_examples(self.test_examples)
 
         # Should fall back to basic module
         assert fixer.use_optimization is False
         assert fixer.compiled_module is None
+        mock_mipro.assert_not_called()
 
-    def test_compile_without_optimization(self):
-        """Test compilation when optimization is disabled."""
-        fixer = PromptFixer(use_optimization=False)
+    @patch('dspy_prompt_fixer.fix_module.MIPROv2')
+    @patch('dspy_prompt_fixer.fix_module.EM')
+    def test_compile_with_examples_error(self, mock_exact_match, mock_mipro):
+        """Test compilation errors fall back to the basic module."""
+        mock_mipro.return_value.compile.side_effect = Exception("Compile error")
+
+        fixer = PromptFixer(use_optimization=True)
         fixer.compile_with_examples(self.test_examples)
 
-        # Should not compile anything
+        assert fixer.use_optimization is False
         assert fixer.compiled_module is None
 
-    def test_fix_prompt_empty_input(self):
-        """Test fixing prompt with empty input."""
-        fixer = PromptFixer()
+    def test_compile_without_optimization(self, fixer_noopt):
+        """Test compilation when optimization is disabled."""
+        fixer_noopt.compile_with_examples(self.test_examples)
+
+        # Should not compile anything
+        assert fixer_noopt.compiled_module is None
 
+    def test_fix_prompt_empty_input(self, fixer_opt):
+        """Test fixing prompt with empty input."""
         with pytest.raises(ValueError, match="Raw prompt cannot be empty"):
-            fixer.fix_prompt("")
+            fixer_opt.fix_prompt("")
 
         with pytest.raises(ValueError, match="Raw prompt cannot be empty"):
-            fixer.fix_prompt("   ")
+            fixer_opt.fix_prompt("   ")
 
-    def test_fix_prompt_none_input(self):
+    def test_fix_prompt_none_input(self, fixer_opt):
         """Test fixing prompt with None input."""
-        fixer = PromptFixer()
-
         with pytest.raises(ValueError, match="Raw prompt cannot be empty"):
-            fixer.fix_prompt(None)
+            fixer_opt.fix_prompt(None)
 
-    @patch('dspy_prompt_fixer.fix_module.dspy.Predict')
     def test_fix_prompt_basic_module(self, mock_predict):
         """Test fixing prompt with basic module (no optimization)."""
-        mock_result = Mock()
-        mock_result.corrected_prompt = "corrected prompt"
-
         mock_predict_instance = Mock()
-        mock_predict_instance.return_value = mock_result
+        mock_predict_instance.return_value = self._prediction
         mock_predict.return_value = mock_predict_instance
 
         fixer = PromptFixer(use_optimization=False)
@@ -140,14 +246,10 @@ class TestPromptFixer:
         assert result == "corrected prompt"
         mock_predict_instance.assert_called_once_with(raw_prompt="test prompt")
 
-    @patch('dspy_prompt_fixer.fix_module.dspy.Predict')
     def test_fix_prompt_compiled_module(self, mock_predict):
         """Test fixing prompt with compiled module."""
-        mock_result = Mock()
-        mock_result.corrected_prompt = "corrected prompt"
-
         mock_compiled = Mock()
-        mock_compiled.return_value = mock_result
+        mock_compiled.return_value = self._prediction
 
         fixer = PromptFixer(use_optimization=True)
         fixer.compiled_module = mock_compiled
@@ -157,22 +259,238 @@ class TestPromptFixer:
         assert result == "corrected prompt"
         mock_compiled.assert_called_once_with(raw_prompt="test prompt")
 
-    @patch('dspy_prompt_fixer.fix_module.dspy.Predict')
     def test_fix_prompt_error_handling(self, mock_predict):
-        """Test error handling in fix_prompt."""
+        """Test an error is raised when both the module and the fallback fail."""
         mock_predict_instance = Mock()
         mock_predict_instance.side_effect = Exception("DSPy error")
         mock_predict.return_value = mock_predict_instance
 
-        fixer = PromptFixer(use_optimization=False)
+        fixer = PromptFixer(use_optimization=False, lm=Mock(side_effect=Exception("API Error")))
 
-        with pytest.raises(RuntimeError, match="Error fixing prompt"):
+        with pytest.raises(RuntimeError, match="Error in fallback prompt fixing: API Error"):
             fixer.fix_prompt("test prompt")
 
-    def test_get_module_info(self):
+    def test_fix_prompt_uses_cache(self, mock_predict):
+        """Test repeated prompts are served from the cache."""
+        mock_result = Mock()
+        mock_result.corrected_prompt = "lambdas in python"
+
+        mock_predict_instance = Mock()
+        mock_predict_instance.return_value = mock_result
+        mock_predict.return_value = mock_predict_instance
+
+        fixer = PromptFixer(use_optimization=False)
+
+        assert fixer.fix_prompt("lamb does in python") == "lambdas in python"
+        assert fixer.fix_prompt("Lamb does in Python ") == "lambdas in python"
+        mock_predict_instance.assert_called_once_with(raw_prompt="lamb does in python")
+
+    def test_fix_prompt_known_example(self, mock_predict):
+        """Test prompts matching a training example skip the LM."""
+        mock_predict_instance = Mock()
+        mock_predict.return_value = mock_predict_instance
+
+        fixer = PromptFixer(use_optimization=False)
+
+        assert fixer.fix_prompt("Frogs in Ruby") == "procs in ruby"
+        mock_predict_instance.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_fix_prompts_async(self):
+        """Test fixing several prompts concurrently."""
+        fixer = PromptFixer(use_optimization=False)
+
+        async def fake_afix(raw_prompt):
+            if raw_prompt == "bad":
+                raise RuntimeError("LM error")
+            return raw_prompt.upper()
+
+        with patch.object(fixer, 'afix_prompt', side_effect=fake_afix):
+            results = await fixer.fix_prompts_async(["frogs in ruby", "bad", "rails and rels"])
+
+        assert results[0] == "FROGS IN RUBY"
+        assert isinstance(results[1], RuntimeError)
+        assert results[2] == "RAILS AND RELS"
+
+    @pytest.mark.asyncio
+    async def test_afix_prompt_basic_module(self):
+        """Test async fixing with the basic module."""
+        fixer = PromptFixer(use_optimization=False)
+        fixer.fix_prompt_module = Mock()
+        fixer.fix_prompt_module.acall = AsyncMock(return_value=self._prediction)
+
+        result = await fixer.afix_prompt("test prompt")
+
+        assert result == "corrected prompt"
+        fixer.fix_prompt_module.acall.assert_called_once_with(raw_prompt="test prompt")
+
+    @pytest.mark.asyncio
+    async def test_afix_prompt_empty_input(self):
+        """Test async fixing with empty input."""
+        fixer = PromptFixer()
+
+        with pytest.raises(ValueError, match="Raw prompt cannot be empty"):
+            await fixer.afix_prompt("  ")
+
+    @patch('dspy_prompt_fixer.fix_module.dspy.settings')
+    def test_fix_prompt_fallback_messages(self, mock_settings, mock_predict):
+        """Test the fallback sends static instructions as a system message."""
+        mock_predict.return_value = Mock(side_effect=Exception("DSPy error"))
+        mock_settings.lm.return_value = "lambdas in python"
+
+        fixer = PromptFixer(use_optimization=False)
+        result = fixer.fix_prompt("lamb does in python")
+
+        assert result == "lambdas in python"
+        messages = mock_settings.lm.call_args[1]['messages']
+        assert messages[0]['role'] == 'system'
+        assert 'lamb does in python' in messages[1]['content']
+        assert 'Raw prompt' not in messages[0]['content']
+
+    @patch('dspy_prompt_fixer.fix_module.dspy.settings')
+    def test_fallback_uses_bound_lm(self, mock_settings):
+        """Test an explicitly bound LM is used instead of DSPy settings."""
+        bound_lm = Mock(return_value="procs in ruby")
+
+        fixer = PromptFixer(use_optimization=False, lm=bound_lm)
+        result = fixer._fix_prompt_fallback("frogs in ruby")
+
+        assert result == "procs in ruby"
+        bound_lm.assert_called_once()
+        mock_settings.lm.assert_not_called()
+
+    def test_fallback_streams_with_claude_lm(self):
+        """Test the fallback reads only the first line from ClaudeLM."""
+        claude_lm = Mock(spec=ClaudeLM)
+        claude_lm.stream_first_line.return_value = "procs in ruby"
+
+        fixer = PromptFixer(use_optimization=False, lm=claude_lm)
+        result = fixer._fix_prompt_fallback("frogs in ruby")
+
+        assert result == "procs in ruby"
+        claude_lm.stream_first_line.assert_called_once()
+        claude_lm.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_astream_prompt(self):
+        """Test streamed pieces join into the stripped first line and are not cached."""
+        async def astream(**kwargs):
+            for chunk in [' "procs', ' in ruby', '"\nThis fixes', ' the word']:
+                yield chunk
+
+        claude_lm = Mock(spec=ClaudeLM)
+        claude_lm.astream.side_effect = astream
+
+        fixer = PromptFixer(use_optimization=False, lm=claude_lm)
+        chunks = [chunk async for chunk in fixer.astream_prompt("lamb does in python")]
+
+        assert chunks == ["procs", " in ruby"]
+        assert fixer.cache.get("lamb does in python") is None
+        assert claude_lm.astream.call_args[1]['stop_sequences'] == ["\n\n"]
+
+    @pytest.mark.asyncio
+    async def test_astream_prompt_known_prompt(self):
+        """Test prompts matching an example are yielded whole without the LM."""
+        claude_lm = Mock(spec=ClaudeLM)
+
+        fixer = PromptFixer(use_optimization=False, lm=claude_lm)
+        chunks = [chunk async for chunk in fixer.astream_prompt("frogs in ruby")]
+
+        assert chunks == ["procs in ruby"]
+        claude_lm.astream.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_astream_prompt_stream_error(self):
+        """Test a stream that fails before any output falls back to afix_prompt."""
+        async def astream(**kwargs):
+            raise RuntimeError("Stream error")
+            yield
+
+        claude_lm = Mock(spec=ClaudeLM)
+        claude_lm.astream.side_effect = astream
+
+        fixer = PromptFixer(use_optimization=False, lm=claude_lm)
+        with patch.object(fixer, 'afix_prompt', AsyncMock(return_value="lambdas in python")):
+            chunks = [chunk async for chunk in fixer.astream_prompt("lamb does in python")]
+
+        assert chunks == ["lambdas in python"]
+
+    def test_parse_fallback_response(self):
+        """Test extracting the corrected prompt from free-form responses."""
+        parse = PromptFixer._parse_fallback_response
+
+        assert parse('Sure.\nCorrected prompt: "procs in ruby"\n') == "procs in ruby"
+        assert parse('"frogs in ruby" → \'procs in ruby\'') == "procs in ruby"
+        assert parse("  procs in ruby  ") == "procs in ruby"
+        assert parse(["Corrected prompt: procs in ruby"]) == "procs in ruby"
+
+    @patch('dspy_prompt_fixer.fix_module.dspy.settings')
+    def test_fix_prompt_batch(self, mock_settings):
+        """Test fixing several prompts with a single LM call."""
+        mock_settings.lm.return_value = "[1] procs and lambdas\n[2] rails and routes in my app"
+
+        fixer = PromptFixer(use_optimization=False)
+        result = fixer.fix_prompt_batch(["frogs and lambdas", "rails and rels in my app"])
+
+        assert result == ["procs and lambdas", "rails and routes in my app"]
+        mock_settings.lm.assert_called_once()
+
+    def test_fix_prompt_batch_skips_known_and_cached(self, all_examples):
+        """Test only uncached prompts reach the LM and their answers are cached."""
+        lm = Mock(return_value="[1] procs and lambdas\n[2] rails and routes in my app")
+        fixer = PromptFixer(use_optimization=False, lm=lm)
+        fixer.cache.put("cached prompt", "from cache")
+        known = all_examples[0]
+
+        result = fixer.fix_prompt_batch(
+            ["frogs and lambdas", known.raw_prompt, "cached prompt", "rails and rels in my app"])
+
+        assert result == ["procs and lambdas", known.corrected_prompt, "from cache", "rails and routes in my app"]
+        assert "frogs and lambdas" in lm.call_args[1]["messages"][-1]["content"]
+        assert "cached prompt" not in lm.call_args[1]["messages"][-1]["content"]
+        assert fixer.cache.get("rails and rels in my app") == "rails and routes in my app"
+
+    @pytest.mark.asyncio
+    async def test_afix_prompt_batch(self):
+        """Test async batching sends one call and reports bad prompts in place."""
+        lm = Mock()
+        lm.acall = AsyncMock(return_value=["[1] procs and lambdas\n[2] rails and routes in my app"])
+        fixer = PromptFixer(use_optimization=False, lm=lm)
+
+        result = await fixer.afix_prompt_batch(["frogs and lambdas", "", "rails and rels in my app"])
+
+        assert result[0] == "procs and lambdas"
+        assert isinstance(result[1], ValueError)
+        assert result[2] == "rails and routes in my app"
+        lm.acall.assert_awaited_once()
+        assert fixer.cache.get("frogs and lambdas") == "procs and lambdas"
+
+    @pytest.mark.asyncio
+    async def test_afix_prompt_batch_single_prompt(self):
+        """Test a lone uncached prompt takes the regular module path."""
+        fixer = PromptFixer(use_optimization=False)
+
+        with patch.object(fixer, 'afix_prompt', AsyncMock(return_value="procs and lambdas")) as mock_afix:
+            result = await fixer.afix_prompt_batch(["frogs and lambdas"])
+
+        assert result == ["procs and lambdas"]
+        mock_afix.assert_awaited_once_with("frogs and lambdas")
+
+    @patch('dspy_prompt_fixer.fix_module.dspy.settings')
+    def test_fix_prompt_batch_count_mismatch(self, mock_settings):
+        """Test batch falls back to per-prompt fixing on a malformed response."""
+        mock_settings.lm.return_value = "[1] procs and lambdas"
+
+        fixer = PromptFixer(use_optimization=False)
+        with patch.object(fixer, 'fix_prompt', side_effect=lambda p: p.upper()) as mock_fix:
+            result = fixer.fix_prompt_batch(["frogs and lambdas", "rails and rels in my app"])
+
+        assert result == ["FROGS AND LAMBDAS", "RAILS AND RELS IN MY APP"]
+        assert mock_fix.call_count == 2
+
+    def test_get_module_info(self, fixer_opt):
         """Test getting module information."""
-        fixer = PromptFixer(use_optimization=True)
-        info = fixer.get_module_info()
+        info = fixer_opt.get_module_info()
 
         assert isinstance(info, dict)
         assert 'use_optimization' in info
@@ -202,7 +520,6 @@ class TestFixPromptQuick:
             {"raw_prompt": "frogs in ruby", "corrected_prompt": "procs in ruby"},
         ]
 
-    @patch('dspy_prompt_fixer.fix_module.PromptFixer')
     def test_fix_prompt_quick_with_examples(self, mock_prompt_fixer_class):
         """Test quick fix with examples."""
         mock_fixer = Mock()
@@ -216,7 +533,6 @@ class TestFixPromptQuick:
         mock_fixer.compile_with_examples.assert_called_once_with(self.test_examples)
         mock_fixer.fix_prompt.assert_called_once_with("test prompt")
 
-    @patch('dspy_prompt_fixer.fix_module.PromptFixer')
     def test_fix_prompt_quick_without_examples(self, mock_prompt_fixer_class):
         """Test quick fix without examples."""
         mock_fixer = Mock()
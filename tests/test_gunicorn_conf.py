@@ -0,0 +1,59 @@
+"""
+Unit tests for the gunicorn configuration.
+"""
+
+import os
+import importlib.util
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+CONF_PATH = Path(__file__).resolve().parent.parent / "gunicorn.conf.py"
+
+
+@pytest.fixture
+def gunicorn_conf():
+    """Load gunicorn.conf.py without leaking the environment it sets."""
+    with patch.dict(os.environ):
+        spec = importlib.util.spec_from_file_location("gunicorn_conf", CONF_PATH)
+        conf = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(conf)
+        yield conf
+
+
+class TestOnStarting:
+    """Test cases for the on_starting precompile hook."""
+
+    def test_skipped_without_optimization(self, gunicorn_conf):
+        """Test nothing is compiled or claimed when optimization is disabled."""
+        server = Mock()
+
+        with patch.dict(os.environ, {"DSPY_USE_OPTIMIZATION": "false"}), \
+                patch('dspy_prompt_fixer.main.precompile_prompt_fixer') as mock_precompile:
+            gunicorn_conf.on_starting(server)
+
+        mock_precompile.assert_not_called()
+        assert "disabled" in server.log.info.call_args[0][0]
+
+    def test_logs_compiled_module(self, gunicorn_conf):
+        """Test a successful precompile is logged with its directory."""
+        server = Mock()
+
+        with patch.dict(os.environ, {"DSPY_USE_OPTIMIZATION": "true"}), \
+                patch('dspy_prompt_fixer.main.precompile_prompt_fixer', return_value=True):
+            gunicorn_conf.on_starting(server)
+
+        assert server.log.info.call_args[0][0] == "DSPy module compiled into %s"
+        server.log.warning.assert_not_called()
+
+    def test_logs_failed_compile(self, gunicorn_conf):
+        """Test a compile that saved nothing is reported as such."""
+        server = Mock()
+
+        with patch.dict(os.environ, {"DSPY_USE_OPTIMIZATION": "true"}), \
+                patch('dspy_prompt_fixer.main.precompile_prompt_fixer', return_value=False):
+            gunicorn_conf.on_starting(server)
+
+        server.log.info.assert_not_called()
+        server.log.warning.assert_called_once()
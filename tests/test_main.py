@@ -4,22 +4,40 @@ Integration tests for FastAPI main application.
 
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, patch, MagicMock, AsyncMock
 import os
+import json
+import asyncio
+import threading
 
+from dspy_prompt_fixer import main
 from dspy_prompt_fixer.main import app
 
 
+@pytest.fixture
+def mock_prompt_fixer(monkeypatch):
+    """Install a mock as the app's initialized prompt fixer."""
+    fixer = MagicMock()
+    monkeypatch.setattr('dspy_prompt_fixer.main.prompt_fixer', fixer)
+    return fixer
+
+
+@pytest.fixture(scope="module")
+def stats_module_info():
+    """Module info reported by an initialized prompt fixer."""
+    return {
+        "use_optimization": True,
+        "has_compiled_module": True,
+        "module_type": "FixProgrammingPrompt"
+    }
+
+
 class TestMainApp:
     """Test cases for the main FastAPI application."""
 
-    def setup_method(self):
-        """Set up test client."""
-        self.client = TestClient(app)
-
-    def test_root_endpoint(self):
+    def test_root_endpoint(self, client):
         """Test the root endpoint."""
-        response = self.client.get("/")
+        response = client.get("/")
 
         assert response.status_code == 200
         data = response.json()
@@ -29,9 +47,9 @@ class TestMainApp:
         assert data["status"] == "running"
         assert data["docs"] == "/docs"
 
-    def test_health_check_uninitialized(self):
+    def test_health_check_uninitialized(self, client):
         """Test health check when DSPy is not initialized."""
-        response = self.client.get("/health")
+        response = client.get("/health")
 
         assert response.status_code == 200
         data = response.json()
@@ -42,8 +60,7 @@ class TestMainApp:
         assert data["model_info"] is None
 
     @patch('dspy_prompt_fixer.main.claude_lm')
-    @patch('dspy_prompt_fixer.main.prompt_fixer')
-    def test_health_check_initialized(self, mock_prompt_fixer, mock_claude_lm):
+    def test_health_check_initialized(self, mock_claude_lm, mock_prompt_fixer, client):
         """Test health check when DSPy is initialized."""
         # Mock the global variables
         mock_claude_lm.get_config.return_value = {
@@ -51,7 +68,7 @@ class TestMainApp:
             "provider": "anthropic"
         }
 
-        response = self.client.get("/health")
+        response = client.get("/health")
 
         assert response.status_code == 200
         data = response.json()
@@ -62,22 +79,52 @@ class TestMainApp:
         assert data["model_info"] is not None
         assert data["model_info"]["provider"] == "anthropic"
 
-    def test_optimize_prompt_uninitialized(self):
-        """Test optimize prompt when DSPy is not initialized."""
-        response = self.client.post("/optimize-prompt", json={
-            "raw_prompt": "frogs in ruby"
-        })
+    @patch('dspy_prompt_fixer.main.claude_lm')
+    def test_health_check_uses_snapshot(self, mock_claude_lm, mock_prompt_fixer, client):
+        """Test health is served from a snapshot of the current state."""
+        snapshot = {"status": "healthy", "dspy_configured": True,
+                    "example_count": {"total": 1}, "model_info": None}
+
+        with patch.object(main, 'health_snapshot', (mock_claude_lm, mock_prompt_fixer, snapshot)):
+            assert client.get("/health").json() == snapshot
+
+        # A snapshot of replaced state is ignored
+        with patch.object(main, 'health_snapshot', (Mock(), Mock(), snapshot)):
+            mock_claude_lm.get_config.return_value = {"provider": "anthropic"}
+            assert client.get("/health").json()["model_info"] == {"provider": "anthropic"}
+
+    def test_ready_uninitialized(self, client):
+        """Test readiness before DSPy is initialized."""
+        response = client.get("/ready")
 
         assert response.status_code == 503
-        data = response.json()
-        assert data["detail"] == "DSPy not initialized"
+        assert response.json() == {"ready": False}
+
+    def test_ready(self, mock_prompt_fixer, client):
+        """Test readiness once DSPy is initialized."""
+        response = client.get("/ready")
+
+        assert response.status_code == 200
+        assert response.json() == {"ready": True}
+
+    @pytest.mark.parametrize("method,path,body", [
+        ("post", "/optimize-prompt", {"raw_prompt": "frogs in ruby"}),
+        ("post", "/optimize-prompt/stream", {"raw_prompt": "frogs in ruby"}),
+        ("post", "/recompile", None),
+        ("get", "/stats", None)
+    ])
+    def test_requires_initialized(self, client, method, path, body):
+        """Test endpoints needing DSPy return 503 before it is initialized."""
+        response = client.request(method, path, json=body)
 
-    @patch('dspy_prompt_fixer.main.prompt_fixer')
-    def test_optimize_prompt_success(self, mock_prompt_fixer):
+        assert response.status_code == 503
+        assert response.json()["detail"] == "DSPy not initialized"
+
+    def test_optimize_prompt_success(self, mock_prompt_fixer, client):
         """Test successful prompt optimization."""
-        mock_prompt_fixer.fix_prompt.return_value = "procs in ruby"
+        mock_prompt_fixer.afix_prompt = AsyncMock(return_value="procs in ruby")
 
-        response = self.client.post("/optimize-prompt", json={
+        response = client.post("/optimize-prompt", json={
             "raw_prompt": "frogs in ruby"
         })
 
@@ -86,14 +133,26 @@ class TestMainApp:
 
         assert data["corrected_prompt"] == "procs in ruby"
         assert data["confidence"] is None
-        mock_prompt_fixer.fix_prompt.assert_called_once_with("frogs in ruby")
+        mock_prompt_fixer.afix_prompt.assert_awaited_once_with("frogs in ruby")
+        mock_prompt_fixer.fix_prompt.assert_not_called()
+
+    def test_optimize_prompt_ignores_extra_fields(self, mock_prompt_fixer, client):
+        """Test unknown request fields are ignored (pydantic's default for BaseModel)."""
+        mock_prompt_fixer.afix_prompt = AsyncMock(return_value="procs in ruby")
+
+        response = client.post("/optimize-prompt", json={
+            "raw_prompt": "frogs in ruby",
+            "session_id": "abc123"
+        })
+
+        assert response.status_code == 200
+        mock_prompt_fixer.afix_prompt.assert_awaited_once_with("frogs in ruby")
 
-    @patch('dspy_prompt_fixer.main.prompt_fixer')
-    def test_optimize_prompt_empty_input(self, mock_prompt_fixer):
+    def test_optimize_prompt_empty_input(self, mock_prompt_fixer, client):
         """Test optimize prompt with empty input."""
-        mock_prompt_fixer.fix_prompt.side_effect = ValueError("Raw prompt cannot be empty")
+        mock_prompt_fixer.afix_prompt = AsyncMock(side_effect=ValueError("Raw prompt cannot be empty"))
 
-        response = self.client.post("/optimize-prompt", json={
+        response = client.post("/optimize-prompt", json={
             "raw_prompt": ""
         })
 
@@ -101,12 +160,11 @@ class TestMainApp:
         data = response.json()
         assert "Raw prompt cannot be empty" in data["detail"]
 
-    @patch('dspy_prompt_fixer.main.prompt_fixer')
-    def test_optimize_prompt_error(self, mock_prompt_fixer):
+    def test_optimize_prompt_error(self, mock_prompt_fixer, client):
         """Test optimize prompt with processing error."""
-        mock_prompt_fixer.fix_prompt.side_effect = Exception("Processing error")
+        mock_prompt_fixer.afix_prompt = AsyncMock(side_effect=Exception("Processing error"))
 
-        response = self.client.post("/optimize-prompt", json={
+        response = client.post("/optimize-prompt", json={
             "raw_prompt": "test prompt"
         })
 
@@ -114,9 +172,81 @@ class TestMainApp:
         data = response.json()
         assert "Error processing prompt" in data["detail"]
 
-    def test_get_examples_all(self):
+    @pytest.mark.asyncio
+    async def test_fix_queued_prompts(self, mock_prompt_fixer):
+        """Test a scheduled batch is fixed with one batched call."""
+        mock_prompt_fixer.afix_prompt_batch = AsyncMock(return_value=["procs in ruby", "rails and routes"])
+
+        result = await main.fix_queued_prompts(["frogs in ruby", "rails and rels"])
+
+        assert result == ["procs in ruby", "rails and routes"]
+        mock_prompt_fixer.afix_prompt_batch.assert_awaited_once_with(
+            ["frogs in ruby", "rails and rels"], batch_size=2)
+
+    @pytest.mark.asyncio
+    async def test_fix_queued_prompts_not_initialized(self):
+        """Test queued prompts fail in place when no fixer is loaded."""
+        with patch.object(main, 'prompt_fixer', None):
+            result = await main.fix_queued_prompts(["a", "b"])
+
+        assert len(result) == 2
+        assert all(isinstance(r, RuntimeError) for r in result)
+
+    def test_lookup_queued_prompt(self, mock_prompt_fixer):
+        """Test known and cached prompts are answered before queueing."""
+        mock_prompt_fixer.cached_correction.return_value = "procs in ruby"
+
+        assert main.lookup_queued_prompt("frogs in ruby") == "procs in ruby"
+        # Empty prompts are queued so the fixer reports the error
+        assert main.lookup_queued_prompt("  ") is None
+        mock_prompt_fixer.cached_correction.assert_called_once_with("frogs in ruby")
+
+    def test_optimize_prompt_stream(self, mock_prompt_fixer, client):
+        """Test the streaming endpoint sends deltas then the full correction."""
+        async def astream_prompt(raw_prompt):
+            for chunk in ["procs", " in ruby"]:
+                yield chunk
+
+        mock_prompt_fixer.astream_prompt = astream_prompt
+
+        response = client.post("/optimize-prompt/stream", json={
+            "raw_prompt": "frogs in ruby"
+        }, headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert "content-encoding" not in response.headers
+        events = [json.loads(line[len("data: "):]) for line in response.text.splitlines() if line]
+        assert events == [
+            {"delta": "procs"},
+            {"delta": " in ruby"},
+            {"corrected_prompt": "procs in ruby"}
+        ]
+
+    def test_optimize_prompt_stream_error(self, mock_prompt_fixer, client):
+        """Test a failure during streaming ends with an error event."""
+        async def astream_prompt(raw_prompt):
+            raise RuntimeError("API Error")
+            yield
+
+        mock_prompt_fixer.astream_prompt = astream_prompt
+
+        response = client.post("/optimize-prompt/stream", json={
+            "raw_prompt": "frogs in ruby"
+        })
+
+        assert response.status_code == 200
+        assert "Error processing prompt: API Error" in response.text
+
+    def test_optimize_prompt_stream_empty_input(self, mock_prompt_fixer, client):
+        """Test empty prompts are rejected before streaming starts."""
+        response = client.post("/optimize-prompt/stream", json={"raw_prompt": "  "})
+
+        assert response.status_code == 400
+
+    def test_get_examples_all(self, client):
         """Test getting all examples."""
-        response = self.client.get("/examples")
+        response = client.get("/examples")
 
         assert response.status_code == 200
         data = response.json()
@@ -130,9 +260,46 @@ class TestMainApp:
             assert "raw_prompt" in example
             assert "corrected_prompt" in example
 
-    def test_get_examples_by_category(self):
+    def test_get_examples_compressed(self, client):
+        """Test large responses are gzip-compressed when accepted."""
+        response = client.get("/examples", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.json()["examples"]) > 0
+
+    @pytest.mark.asyncio
+    async def test_event_stream_not_buffered_by_gzip(self):
+        """Test each server-sent event reaches the client as soon as it is sent."""
+        events = [b"data: {\"delta\": \"procs\"}\n\n", b"data: {\"delta\": \" in ruby\"}\n\n"]
+
+        async def stream_app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200,
+                        "headers": [(b"content-type", b"text/event-stream")]})
+            for event in events:
+                await send({"type": "http.response.body", "body": event, "more_body": True})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "headers": [(b"accept-encoding", b"gzip")]}
+        await main.EventStreamGZipMiddleware(stream_app, minimum_size=1)(scope, None, send)
+
+        assert b"content-encoding" not in dict(sent[0]["headers"])
+        assert [message["body"] for message in sent[1:3]] == events
+
+    def test_small_responses_uncompressed(self, client):
+        """Test small responses skip compression."""
+        response = client.get("/", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+
+    def test_get_examples_by_category(self, client):
         """Test getting examples by category."""
-        response = self.client.get("/examples?category=programming")
+        response = client.get("/examples?category=programming")
 
         assert response.status_code == 200
         data = response.json()
@@ -140,9 +307,9 @@ class TestMainApp:
         assert "examples" in data
         assert isinstance(data["examples"], list)
 
-    def test_get_examples_invalid_category(self):
+    def test_get_examples_invalid_category(self, client):
         """Test getting examples with invalid category."""
-        response = self.client.get("/examples?category=invalid")
+        response = client.get("/examples?category=invalid")
 
         assert response.status_code == 200
         data = response.json()
@@ -150,10 +317,9 @@ class TestMainApp:
         assert "examples" in data
         assert data["examples"] == []
 
-    @patch('dspy_prompt_fixer.main.prompt_fixer')
-    def test_add_training_example_success(self, mock_prompt_fixer):
+    def test_add_training_example_success(self, mock_prompt_fixer, client, restore_examples):
         """Test adding a training example successfully."""
-        response = self.client.post("/examples", json={
+        response = client.post("/examples", json={
             "raw_prompt": "test raw prompt",
             "corrected_prompt": "test corrected prompt",
             "category": "programming"
@@ -163,9 +329,114 @@ class TestMainApp:
         data = response.json()
         assert data["message"] == "Example added successfully"
 
-    def test_add_training_example_invalid_category(self):
+        # Recompiling is left to the background worker
+        mock_prompt_fixer.compile_with_examples.assert_not_called()
+        assert main.examples_dirty.is_set()
+        main.clear_pending_recompile()
+
+    def test_add_training_examples_batch(self, mock_prompt_fixer, client, restore_examples):
+        """Test adding several examples with one request."""
+        total = len(client.get("/examples").json()["examples"])
+
+        response = client.post("/examples/batch", json={"examples": [
+            {"raw_prompt": "frogs in go", "corrected_prompt": "procs in go"},
+            {"raw_prompt": "pie thon", "corrected_prompt": "python", "category": "speech"}
+        ]})
+
+        assert response.status_code == 200
+        assert response.json()["message"] == "Added 2 examples"
+        assert len(client.get("/examples").json()["examples"]) == total + 2
+        assert main.pending_examples == 2
+        main.clear_pending_recompile()
+
+    def test_add_training_examples_batch_invalid_category(self, client):
+        """Test a batch with an unknown category is rejected."""
+        response = client.post("/examples/batch", json={"examples": [
+            {"raw_prompt": "a", "corrected_prompt": "b", "category": "invalid"}
+        ]})
+
+        assert response.status_code == 400
+        assert "Unknown category" in response.json()["detail"]
+
+    @patch('dspy_prompt_fixer.main.create_prompt_fixer')
+    def test_recompile(self, mock_create, mock_prompt_fixer, client):
+        """Test recompiling on demand swaps in a newly compiled fixer."""
+        new_fixer = mock_create.return_value
+        main.request_recompile()
+
+        response = client.post("/recompile")
+
+        assert response.status_code == 200
+        assert response.json()["message"] == "DSPy recompiled successfully"
+        mock_create.assert_called_once_with(main.claude_lm, mock_prompt_fixer.cache)
+        new_fixer.compile_with_examples.assert_called_once()
+        new_fixer.cache.clear.assert_called_once()
+        mock_prompt_fixer.compile_with_examples.assert_not_called()
+        assert main.prompt_fixer is new_fixer
+        assert not main.examples_dirty.is_set()
+
+    @patch('dspy_prompt_fixer.main.create_prompt_fixer')
+    def test_recompile_failure_keeps_serving_fixer(self, mock_create, mock_prompt_fixer, client):
+        """Test a failed compile leaves the serving fixer untouched."""
+        # compile_with_examples turns optimization off when it fails
+        mock_create.return_value.use_optimization = False
+
+        with patch.dict(os.environ, {"DSPY_USE_OPTIMIZATION": "true"}):
+            response = client.post("/recompile")
+
+        assert response.status_code == 500
+        assert main.prompt_fixer is mock_prompt_fixer
+        mock_prompt_fixer.cache.clear.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch('dspy_prompt_fixer.main.create_prompt_fixer')
+    async def test_recompile_does_not_block_examples(self, mock_create, mock_prompt_fixer, restore_examples):
+        """Test examples can be added while a recompile is compiling."""
+        started, release = threading.Event(), threading.Event()
+        new_fixer = mock_create.return_value
+
+        def compile_with_examples(examples, compile_lm=None):
+            started.set()
+            release.wait(5)
+
+        new_fixer.compile_with_examples.side_effect = compile_with_examples
+
+        task = asyncio.create_task(main.recompile_examples())
+        try:
+            assert await asyncio.to_thread(started.wait, 5)
+            response = await asyncio.wait_for(main.add_training_example(
+                main.ExampleRequest(raw_prompt="frogs in go", corrected_prompt="procs in go")
+            ), 1)
+
+            assert response == {"message": "Example added successfully"}
+            assert main.prompt_fixer is mock_prompt_fixer
+        finally:
+            release.set()
+            await task
+
+        assert main.prompt_fixer is new_fixer
+        assert main.examples_dirty.is_set()
+        main.clear_pending_recompile()
+
+    @pytest.mark.asyncio
+    @patch('dspy_prompt_fixer.main.create_prompt_fixer')
+    async def test_recompile_worker_debounces(self, mock_create, mock_prompt_fixer):
+        """Test examples added together trigger a single recompile."""
+        with patch.dict(os.environ, {"DSPY_RECOMPILE_DELAY": "0.05"}):
+            worker = asyncio.create_task(main.recompile_worker())
+            try:
+                main.request_recompile()
+                main.request_recompile()
+                await asyncio.sleep(0.2)
+            finally:
+                worker.cancel()
+
+        mock_create.return_value.compile_with_examples.assert_called_once()
+        assert main.pending_examples == 0
+
+    def test_add_training_example_invalid_category(self, client):
         """Test adding example with invalid category."""
-        response = self.client.post("/examples", json={
+        response = client.post("/examples", json={
             "raw_prompt": "test raw prompt",
             "corrected_prompt": "test corrected prompt",
             "category": "invalid"
@@ -175,25 +446,21 @@ class TestMainApp:
         data = response.json()
         assert "Unknown category" in data["detail"]
 
-    def test_add_training_example_missing_fields(self):
+    def test_add_training_example_missing_fields(self, client):
         """Test adding example with missing required fields."""
-        response = self.client.post("/examples", json={
+        response = client.post("/examples", json={
             "raw_prompt": "test raw prompt"
             # Missing corrected_prompt
         })
 
         assert response.status_code == 422  # Validation error
 
-    @patch('dspy_prompt_fixer.main.prompt_fixer')
-    def test_get_stats_success(self, mock_prompt_fixer):
+    def test_get_stats_success(self, mock_prompt_fixer, stats_module_info, client):
         """Test getting service statistics."""
-        mock_prompt_fixer.get_module_info.return_value = {
-            "use_optimization": True,
-            "has_compiled_module": True,
-            "module_type": "FixProgrammingPrompt"
-        }
+        mock_prompt_fixer.get_module_info.return_value = stats_module_info
+        mock_prompt_fixer.cache.stats.return_value = {"size": 1, "hits": 3, "misses": 1, "hit_rate": 0.75}
 
-        response = self.client.get("/stats")
+        response = client.get("/stats")
 
         assert response.status_code == 200
         data = response.json()
@@ -204,22 +471,15 @@ class TestMainApp:
 
         assert isinstance(data["total_examples"], int)
         assert isinstance(data["categories"], dict)
-        assert isinstance(data["module_info"], dict)
-
-    def test_get_stats_uninitialized(self):
-        """Test getting stats when DSPy is not initialized."""
-        response = self.client.get("/stats")
-
-        assert response.status_code == 503
-        data = response.json()
-        assert data["detail"] == "DSPy not initialized"
+        assert data["module_info"] == stats_module_info
+        assert data["cache_info"]["hit_rate"] == 0.75
 
     @patch('dspy_prompt_fixer.main.initialize_dspy')
-    def test_reinitialize_success(self, mock_initialize):
+    def test_reinitialize_success(self, mock_initialize, client):
         """Test successful DSPy reinitialization."""
         mock_initialize.return_value = True
 
-        response = self.client.post("/reinitialize")
+        response = client.post("/reinitialize")
 
         assert response.status_code == 200
         data = response.json()
@@ -227,13 +487,13 @@ class TestMainApp:
         mock_initialize.assert_called_once()
 
     @patch('dspy_prompt_fixer.main.initialize_dspy')
-    def test_reinitialize_failure(self, mock_initialize):
+    def test_reinitialize_failure(self, mock_initialize, client):
         """Test failed DSPy reinitialization."""
         # Make sure the mock doesn't raise an exception
         mock_initialize.side_effect = None
         mock_initialize.return_value = False
 
-        response = self.client.post("/reinitialize")
+        response = client.post("/reinitialize")
 
         assert response.status_code == 500
         data = response.json()
@@ -241,29 +501,135 @@ class TestMainApp:
         mock_initialize.assert_called_once()
 
     @patch('dspy_prompt_fixer.main.initialize_dspy')
-    def test_reinitialize_error(self, mock_initialize):
+    def test_reinitialize_error(self, mock_initialize, client):
         """Test DSPy reinitialization with error."""
         mock_initialize.side_effect = Exception("Initialization error")
 
-        response = self.client.post("/reinitialize")
+        response = client.post("/reinitialize")
 
         assert response.status_code == 500
         data = response.json()
         assert "Error reinitializing" in data["detail"]
 
-    def test_cors_headers(self):
-        """Test that CORS headers are properly set."""
-        response = self.client.options("/")
-
-        # CORS preflight should be handled
-        assert response.status_code in [200, 405]  # 405 is also acceptable for OPTIONS
+    @pytest.mark.asyncio
+    @patch('dspy_prompt_fixer.main.dspy')
+    @patch('dspy_prompt_fixer.main.build_prompt_fixer')
+    async def test_initialize_dspy_swaps_state(self, mock_build, mock_dspy):
+        """Test initialization publishes the new model and fixer together."""
+        new_lm, new_fixer = Mock(), Mock()
+        mock_build.return_value = (new_lm, new_fixer)
+
+        with patch.object(main, 'claude_lm', None), patch.object(main, 'prompt_fixer', None):
+            assert await main.initialize_dspy() is True
+            assert main.claude_lm is new_lm
+            assert main.prompt_fixer is new_fixer
+
+        mock_dspy.settings.configure.assert_called_once_with(lm=new_lm)
+
+    @pytest.mark.asyncio
+    @patch('dspy_prompt_fixer.main.dspy')
+    @patch('dspy_prompt_fixer.main.build_prompt_fixer')
+    async def test_initialize_dspy_configures_on_loop_thread(self, mock_build, mock_dspy):
+        """Test repeated initialization builds off the loop but configures DSPy on it."""
+        # dspy.settings rejects changes from any thread but the one that first configured it
+        build_threads, configure_threads = [], []
+        mock_build.side_effect = lambda *args: build_threads.append(threading.get_ident()) or (Mock(), Mock())
+        mock_dspy.settings.configure.side_effect = lambda **kwargs: configure_threads.append(threading.get_ident())
+
+        with patch.object(main, 'claude_lm', None), patch.object(main, 'prompt_fixer', None):
+            assert await main.initialize_dspy() is True
+            assert await main.initialize_dspy() is True
+
+        loop_thread = threading.get_ident()
+        assert configure_threads == [loop_thread, loop_thread]
+        assert loop_thread not in build_threads
+
+    @pytest.mark.asyncio
+    @patch('dspy_prompt_fixer.main.build_prompt_fixer')
+    async def test_initialize_dspy_failure_keeps_state(self, mock_build):
+        """Test a failed rebuild leaves the serving fixer in place."""
+        mock_build.side_effect = Exception("Compile error")
+        current = Mock()
+
+        with patch.object(main, 'prompt_fixer', current):
+            assert await main.initialize_dspy() is False
+            assert main.prompt_fixer is current
+
+    def test_create_prompt_cache_loads_file_only_when_asked(self, tmp_path):
+        """Test only startup restores the saved cache; a reinitialize starts empty."""
+        path = str(tmp_path / "cache.pkl")
+        saved = main.PromptCache()
+        saved.put("frogs in ruby", "procs in ruby")
+        saved.save(path)
+
+        with patch.dict(os.environ, {"DSPY_CACHE_FILE": path}):
+            assert len(main.create_prompt_cache(load_file=True)) == 1
+            assert len(main.create_prompt_cache()) == 0
+
+    @patch('dspy_prompt_fixer.main.reset_clients')
+    @patch('dspy_prompt_fixer.main.build_prompt_fixer')
+    def test_precompile_prompt_fixer(self, mock_build, mock_reset):
+        """Test precompiling saves a module and drops clients before workers fork."""
+        mock_build.return_value = (Mock(), Mock(compiled_module=Mock()))
+
+        with patch.dict(os.environ, {"DSPY_USE_OPTIMIZATION": "true", "DSPY_COMPILED_DIR": "/tmp/compiled"}):
+            assert main.precompile_prompt_fixer() is True
+
+        mock_build.assert_called_once()
+        mock_reset.assert_called_once()
+
+        # A failed compile leaves no compiled module behind
+        mock_build.return_value = (Mock(), Mock(compiled_module=None))
+        with patch.dict(os.environ, {"DSPY_USE_OPTIMIZATION": "true", "DSPY_COMPILED_DIR": "/tmp/compiled"}):
+            assert main.precompile_prompt_fixer() is False
+
+    @patch('dspy_prompt_fixer.main.build_prompt_fixer')
+    def test_precompile_prompt_fixer_without_optimization(self, mock_build):
+        """Test nothing is built when optimization is disabled."""
+        with patch.dict(os.environ, {"DSPY_USE_OPTIMIZATION": "false", "DSPY_COMPILED_DIR": "/tmp/compiled"}):
+            assert main.precompile_prompt_fixer() is False
+
+        mock_build.assert_not_called()
+
+    def test_openapi_documents_direct_responses(self, client):
+        """Test endpoints returning JSON directly still document their models."""
+        schema = client.get("/openapi.json").json()
+
+        for path, method, model in [
+            ("/optimize-prompt", "post", "PromptResponse"),
+            ("/health", "get", "HealthResponse"),
+            ("/stats", "get", "StatsResponse"),
+        ]:
+            content = schema["paths"][path][method]["responses"]["200"]["content"]
+            assert content["application/json"]["schema"]["$ref"].endswith(model)
 
-    def test_docs_endpoint(self):
-        """Test that docs endpoint is accessible."""
-        response = self.client.get("/docs")
-        assert response.status_code == 200
+    @patch('dspy_prompt_fixer.main.initialize_dspy')
+    def test_lifespan_starts_and_stops_background_work(self, mock_initialize):
+        """Test the lifespan handler initializes DSPy and manages background tasks."""
+        mock_initialize.return_value = True
 
-    def test_redoc_endpoint(self):
-        """Test that redoc endpoint is accessible."""
-        response = self.client.get("/redoc")
-        assert response.status_code == 200
+        with patch.object(main, 'batch_scheduler', None), \
+                patch.object(main, 'recompile_task', None), \
+                patch.object(main, 'health_task', None), \
+                patch.object(main, 'health_snapshot', None), \
+                patch.object(main, 'examples_lock', main.examples_lock), \
+                patch.object(main, 'recompile_lock', main.recompile_lock), \
+                patch.object(main, 'examples_dirty', main.examples_dirty), \
+                patch.object(main, 'recompile_due', main.recompile_due):
+            with TestClient(app):
+                mock_initialize.assert_awaited_once_with(load_cache=True)
+                assert main.batch_scheduler is not None
+                recompile_task = main.recompile_task
+                assert not recompile_task.done()
+
+            assert recompile_task.cancelled()
+
+    @pytest.mark.parametrize("method,path,ok", [
+        ("get", "/docs", {200}),
+        ("get", "/redoc", {200}),
+        # CORS preflight should be handled; 405 is also acceptable for OPTIONS
+        ("options", "/", {200, 405})
+    ])
+    def test_endpoint_available(self, client, method, path, ok):
+        """Test the docs pages and CORS preflight respond."""
+        assert getattr(client, method)(path).status_code in ok
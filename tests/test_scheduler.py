@@ -0,0 +1,161 @@
+"""
+Unit tests for request batching module.
+"""
+
+import asyncio
+import pytest
+from dspy_prompt_fixer.scheduler import BatchScheduler
+
+
+class TestBatchScheduler:
+    """Test cases for BatchScheduler class."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_prompts_share_a_batch(self):
+        """Test prompts submitted together are fixed in one batch."""
+        batches = []
+
+        async def fix_batch(raw_prompts):
+            batches.append(raw_prompts)
+            return [p.replace("frogs", "procs") for p in raw_prompts]
+
+        scheduler = BatchScheduler(fix_batch, max_batch=8, max_delay_ms=50)
+        scheduler.start()
+        try:
+            results = await asyncio.gather(
+                scheduler.submit("frogs in ruby"),
+                scheduler.submit("frogs and lambdas")
+            )
+        finally:
+            await scheduler.stop()
+
+        assert results == ["procs in ruby", "procs and lambdas"]
+        assert batches == [["frogs in ruby", "frogs and lambdas"]]
+
+    @pytest.mark.asyncio
+    async def test_batch_size_limit(self):
+        """Test a full batch is dispatched without waiting for the delay."""
+        batches = []
+
+        async def fix_batch(raw_prompts):
+            batches.append(raw_prompts)
+            return raw_prompts
+
+        scheduler = BatchScheduler(fix_batch, max_batch=2, max_delay_ms=1000)
+        scheduler.start()
+        try:
+            results = await asyncio.wait_for(
+                asyncio.gather(*(scheduler.submit(str(i)) for i in range(4))),
+                timeout=0.5
+            )
+        finally:
+            await scheduler.stop()
+
+        assert results == ["0", "1", "2", "3"]
+        assert batches == [["0", "1"], ["2", "3"]]
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_their_caller(self):
+        """Test a failed prompt raises only for the request that sent it."""
+        async def fix_batch(raw_prompts):
+            return [ValueError("Raw prompt cannot be empty") if not p else p
+                    for p in raw_prompts]
+
+        scheduler = BatchScheduler(fix_batch, max_delay_ms=20)
+        scheduler.start()
+        try:
+            results = await asyncio.gather(
+                scheduler.submit(""),
+                scheduler.submit("procs in ruby"),
+                return_exceptions=True
+            )
+        finally:
+            await scheduler.stop()
+
+        assert isinstance(results[0], ValueError)
+        assert results[1] == "procs in ruby"
+
+    @pytest.mark.asyncio
+    async def test_batch_failure_fails_every_caller(self):
+        """Test an exception from the fixer is raised for the whole batch."""
+        async def fix_batch(raw_prompts):
+            raise RuntimeError("API Error")
+
+        scheduler = BatchScheduler(fix_batch, max_delay_ms=20)
+        scheduler.start()
+        try:
+            results = await asyncio.gather(
+                scheduler.submit("a"),
+                scheduler.submit("b"),
+                return_exceptions=True
+            )
+        finally:
+            await scheduler.stop()
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_lone_prompt_is_not_delayed(self):
+        """Test an idle scheduler dispatches a single prompt right away."""
+        async def fix_batch(raw_prompts):
+            return raw_prompts
+
+        scheduler = BatchScheduler(fix_batch, max_delay_ms=1000)
+        scheduler.start()
+        try:
+            result = await asyncio.wait_for(scheduler.submit("procs in ruby"), timeout=0.5)
+        finally:
+            await scheduler.stop()
+
+        assert result == "procs in ruby"
+
+    @pytest.mark.asyncio
+    async def test_lookup_answers_before_queueing(self):
+        """Test prompts the lookup can answer never reach the fixer."""
+        batches = []
+
+        async def fix_batch(raw_prompts):
+            batches.append(raw_prompts)
+            return raw_prompts
+
+        scheduler = BatchScheduler(fix_batch, lookup={"frogs in ruby": "procs in ruby"}.get)
+        scheduler.start()
+        try:
+            results = await asyncio.gather(
+                scheduler.submit("frogs in ruby"),
+                scheduler.submit("rails and routes")
+            )
+        finally:
+            await scheduler.stop()
+
+        assert results == ["procs in ruby", "rails and routes"]
+        assert batches == [["rails and routes"]]
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit(self):
+        """Test prompts arriving while every slot is busy wait and share the next batch."""
+        batches = []
+        release = asyncio.Event()
+
+        async def fix_batch(raw_prompts):
+            batches.append(raw_prompts)
+            await release.wait()
+            return raw_prompts
+
+        scheduler = BatchScheduler(fix_batch, max_delay_ms=0, max_concurrency=1)
+        scheduler.start()
+        try:
+            first = asyncio.ensure_future(scheduler.submit("a"))
+            await asyncio.sleep(0.01)
+            rest = asyncio.gather(scheduler.submit("b"), scheduler.submit("c"))
+            await asyncio.sleep(0.01)
+
+            assert batches == [["a"]]
+
+            release.set()
+            results = await asyncio.wait_for(asyncio.gather(first, rest), timeout=0.5)
+        finally:
+            await scheduler.stop()
+
+        assert results == ["a", ["b", "c"]]
+        assert batches == [["a"], ["b", "c"]]